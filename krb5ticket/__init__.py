@@ -1,4 +1,60 @@
+import sys
+import types
+import importlib
+
 from .errors import KeytabFileNotExists
-from .krb5 import Krb5
-from .ktutil import ktutil
-from .ktutil_helpers import create_entries, list_entries, delete_entries
\ No newline at end of file
+
+
+# Public names are imported on first access so ``import krb5ticket`` does
+# not pay for ``gssapi`` or ``subprocess`` until they are actually used.
+_LAZY_ATTRIBUTES = {
+    "Krb5": "krb5ticket.krb5",
+    "AsyncKrb5": "krb5ticket.aio",
+    "Krb5Manager": "krb5ticket.manager",
+    "RenewalScheduler": "krb5ticket.renewal",
+    "ktutil": "krb5ticket.ktutil",
+    "KtutilSession": "krb5ticket.ktutil",
+    "KtutilPool": "krb5ticket.ktutil_pool",
+    "create_entries": "krb5ticket.ktutil_helpers",
+    "list_entries": "krb5ticket.ktutil_helpers",
+    "delete_entries": "krb5ticket.ktutil_helpers",
+    "compact_keytab": "krb5ticket.ktutil_helpers",
+    "compact_keytabs": "krb5ticket.ktutil_helpers",
+    "Keylist": "krb5ticket.keylist",
+    "KeytabEntry": "krb5ticket.keylist",
+}
+
+__all__ = ["KeytabFileNotExists", *_LAZY_ATTRIBUTES]
+
+
+class _Package(types.ModuleType):
+    """
+    Package module keeping ``krb5ticket.ktutil`` bound to the ``ktutil``
+    class.
+
+    Importing the ``krb5ticket.ktutil`` submodule binds the module to the
+    package attribute of the same name, which would shadow the class.
+    """
+    def __setattr__(self, name, value):
+        if name == "ktutil" and isinstance(value, types.ModuleType):
+            value = value.ktutil
+        super().__setattr__(name, value)
+
+
+def __getattr__(name: str):
+    """
+    Imports public names on first access.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY_ATTRIBUTES[name])
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+sys.modules[__name__].__class__ = _Package
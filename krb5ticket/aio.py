@@ -0,0 +1,155 @@
+import typing as t
+import os
+import hmac
+import asyncio
+import hashlib
+import functools
+import threading
+import concurrent.futures
+
+from krb5ticket.krb5 import Krb5
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {}
+# Arguments, such as passwords, are only kept in in-flight keys as keyed
+# digests.
+_digest_key = os.urandom(32)
+
+
+def default_executor() -> concurrent.futures.Executor:
+    """
+    Gets the executor shared by ``AsyncKrb5`` objects.
+
+    :return: ``concurrent.futures.ThreadPoolExecutor`` object with a small,
+        bounded number of workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix="krb5")
+        return _executor
+
+
+class AsyncKrb5:
+    """
+    asyncio interface to Kerberos V5 ticket acquisition.
+
+    GSSAPI calls block for a full KDC round-trip, so they run off the
+    event loop on a bounded executor. Concurrent acquisitions for the
+    same principal and credential cache, made with the same arguments,
+    collapse into a single in-flight call whose result every caller
+    awaits.
+
+    :param principal: Kerberos principal.
+    :param ccache: Kerberos credential cache.
+    :param executor: ``concurrent.futures.Executor`` running the GSSAPI
+        calls, defaults to ``default_executor()``.
+    :param kwargs: additional keyword arguments for ``Krb5``.
+    """
+    def __init__(
+        self,
+        principal: str,
+        ccache: str = None,
+        executor: t.Optional[concurrent.futures.Executor] = None,
+        **kwargs
+    ) -> t.NoReturn:
+        self.krb5 = Krb5(principal, ccache, **kwargs)
+        self.executor = executor
+
+    async def _call(self, method: str, *args) -> t.Any:
+        """
+        Runs a ``Krb5`` method off the event loop, sharing the result with
+        concurrent callers.
+
+        :param method: ``Krb5`` method name.
+        :param args: arguments for the method.
+        :return: result of the method.
+        """
+        loop = asyncio.get_running_loop()
+        ccache = self.krb5.ccache["ccache"] if self.krb5.ccache else None
+        digest = hmac.new(
+            _digest_key, repr(args).encode("UTF-8", "surrogateescape"),
+            hashlib.sha256).digest()
+        key = (loop, str(self.krb5.principal), ccache, method, digest)
+        future = _inflight.get(key)
+        if future is None:
+            future = loop.run_in_executor(
+                self.executor or default_executor(),
+                functools.partial(getattr(self.krb5, method), *args))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        # A cancelled caller must not cancel the call for the others.
+        return await asyncio.shield(future)
+
+    async def is_expired(self) -> bool:
+        """
+        Gets the Kerberos credential expiry state.
+
+        :return: True when the credentials are expired or missing,
+            otherwise False.
+        """
+        if self.krb5._cached_creds() is not None:
+            return False
+        return not await self._call("acquire_from_default")
+
+    async def acquire_from_default(self, usage: str = "initiate") -> bool:
+        """
+        Acquire Kerberos ticket-granting ticket (TGT) from existing default
+        store.
+
+        :param usage: usage to store the credentials with -- either 'both',
+            'initiate' or 'accept'.
+        :return: True on success, otherwise False.
+        """
+        return await self._call("acquire_from_default", usage)
+
+    async def acquire_with_keytab(
+        self,
+        keytab: str,
+        usage: str = "initiate",
+        set_default: bool = True,
+        overwrite: bool = True,
+        force: bool = False
+    ) -> bool:
+        """
+        Acquire Kerberos ticket-granting ticket (TGT) with keytab.
+
+        :param keytab: Kerberos keytab file.
+        :param usage: usage to store the credentials with -- either 'both',
+            'initiate' or 'accept'.
+        :param set_default: whether or not to set these credentials as the
+            default for the given store.
+        :param overwrite: whether or not to overwrite existing credentials
+            stored with the same name.
+        :param force: whether or not to acquire a new TGT even when the
+            credential cache holds a valid one.
+        :return: True on success, otherwise False.
+        """
+        return await self._call(
+            "acquire_with_keytab", keytab, usage, set_default, overwrite,
+            force)
+
+    async def acquire_with_password(
+        self,
+        password: str,
+        usage: str = "initiate",
+        set_default: bool = True,
+        overwrite: bool = True
+    ) -> bool:
+        """
+        Acquire Kerberos ticket-granting ticket (TGT) with password.
+
+        :param password: Kerberos credential password.
+        :param usage: usage to store the credentials with -- either
+            'both', 'initiate' or 'accept'.
+        :param set_default: whether or not to set these credentials
+            as the default for the given store.
+        :param overwrite: whether or not to overwrite existing
+            credentials stored with the same name.
+        :return: True on success, otherwise False.
+        """
+        return await self._call(
+            "acquire_with_password", password, usage, set_default, overwrite)
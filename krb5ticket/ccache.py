@@ -0,0 +1,203 @@
+import typing as t
+import mmap
+import struct
+
+from krb5ticket.errors import CcacheFormatError
+from krb5ticket.keytab import unparse_principal
+
+
+CCACHE_MAGIC = 0x05
+CCACHE_VERSIONS = (0x01, 0x02, 0x03, 0x04)
+
+#: Kerberos ticket flags, by bit value.
+TICKET_FLAGS = {
+    0x40000000: "forwardable",
+    0x20000000: "forwarded",
+    0x10000000: "proxiable",
+    0x08000000: "proxy",
+    0x04000000: "may_postdate",
+    0x02000000: "postdated",
+    0x01000000: "invalid",
+    0x00800000: "renewable",
+    0x00400000: "initial",
+    0x00200000: "pre_authent",
+    0x00100000: "hw_authent",
+    0x00080000: "transit_policy_checked",
+    0x00040000: "ok_as_delegate",
+    0x00010000: "anonymous",
+}
+
+_CONFIG_REALM = "X-CACHECONF:"
+
+
+class _Reader:
+    """
+    Sequential reader over the content of a credential cache.
+    """
+    __slots__ = ("data", "offset", "version", "byteorder")
+
+    def __init__(self, data: t.Union[bytes, mmap.mmap]) -> None:
+        self.data = data
+        if len(data) < 2 or data[0] != CCACHE_MAGIC \
+                or data[1] not in CCACHE_VERSIONS:
+            raise CcacheFormatError("Unsupported Kerberos ccache format.")
+        self.version = data[1]
+        self.byteorder = ">" if self.version >= 0x03 else "="
+        self.offset = 2
+
+    def unpack(self, fmt: str) -> tuple:
+        values = struct.unpack_from(self.byteorder + fmt, self.data, self.offset)
+        self.offset += struct.calcsize(self.byteorder + fmt)
+        return values
+
+    def skip_data(self) -> None:
+        (length,) = self.unpack("I")
+        self.offset += length
+
+    def read_data(self) -> bytes:
+        (length,) = self.unpack("I")
+        start = self.offset
+        self.offset += length
+        if self.offset > len(self.data):
+            raise struct.error("counted octet string is truncated")
+        return bytes(self.data[start:self.offset])
+
+    def read_principal(self) -> t.Tuple[str, str]:
+        """
+        Reads a principal.
+
+        :return: tuple of the principal name and its realm.
+        """
+        if self.version == 0x01:
+            (count,) = self.unpack("I")
+            count -= 1
+        else:
+            _, count = self.unpack("II")
+        realm = self.read_data().decode("UTF-8", "surrogateescape")
+        components = [
+            self.read_data().decode("UTF-8", "surrogateescape")
+            for _ in range(count)
+        ]
+        return unparse_principal(components, realm), realm
+
+
+def _parse(data: t.Union[bytes, mmap.mmap]) -> dict:
+    """
+    Parses the content of a credential cache.
+
+    :param data: raw credential cache content.
+    :return: dictionary object containing the credential cache.
+    """
+    reader = _Reader(data)
+    kdc_offset = 0
+    try:
+        if reader.version == 0x04:
+            (length,) = reader.unpack("H")
+            end = reader.offset + length
+            while reader.offset < end:
+                tag, taglen = reader.unpack("HH")
+                if tag == 1 and taglen == 8:
+                    seconds, _ = reader.unpack("iI")
+                    kdc_offset = seconds
+                else:
+                    reader.offset += taglen
+            reader.offset = end
+
+        default_principal, _ = reader.read_principal()
+        credentials = []
+        while reader.offset < len(data):
+            client, _ = reader.read_principal()
+            server, server_realm = reader.read_principal()
+            (enctype,) = reader.unpack("H")
+            if reader.version == 0x03:
+                reader.unpack("H")
+            reader.skip_data()
+            authtime, starttime, endtime, renew_till, is_skey, flags \
+                = reader.unpack("IIIIBI")
+            for _ in range(2):
+                # Addresses, then authorization data.
+                (count,) = reader.unpack("I")
+                for _ in range(count):
+                    reader.unpack("H")
+                    reader.skip_data()
+            reader.skip_data()
+            reader.skip_data()
+            if reader.offset > len(data):
+                raise struct.error("credential is truncated")
+            credentials.append({
+                "client": client,
+                "server": server,
+                "enctype": enctype,
+                "authtime": authtime,
+                "starttime": starttime or authtime,
+                "endtime": endtime,
+                "renew_till": renew_till,
+                "flags": [name for bit, name in TICKET_FLAGS.items()
+                          if flags & bit],
+                "is_skey": bool(is_skey),
+                "is_config": server_realm == _CONFIG_REALM,
+            })
+    except struct.error as e:
+        raise CcacheFormatError(f"Kerberos ccache is malformed: {e}")
+
+    return {
+        "version": 0x0500 | reader.version,
+        "default_principal": default_principal,
+        "kdc_offset": kdc_offset,
+        "credentials": credentials,
+    }
+
+
+def read_ccache(ccache_file: str) -> dict:
+    """
+    Reads a Kerberos ``FILE:`` credential cache.
+
+    The credential cache is memory-mapped and parsed natively, without
+    loading GSSAPI. Keys and tickets are skipped; only the metadata of
+    each credential is returned. Versions 1 to 4 of the MIT format are
+    supported.
+
+    :param ccache_file: credential cache file, with or without the
+        ``FILE:`` prefix.
+    :return: dictionary object with keys: version, default_principal,
+        kdc_offset (seconds) and credentials, a list of dictionary
+        objects with keys: client, server, enctype, authtime, starttime,
+        endtime, renew_till (seconds since the epoch), flags, is_skey and
+        is_config.
+    :raises: ``CcacheFormatError`` if the file is not a valid credential
+        cache, and ``OSError`` if it cannot be read.
+    """
+    if ccache_file.startswith("FILE:"):
+        ccache_file = ccache_file[5:]
+    with open(ccache_file, "rb") as fh:
+        try:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped.
+            raise CcacheFormatError("Kerberos ccache is empty.")
+        with data:
+            return _parse(data)
+
+
+def find_tgt(
+    ccache: dict,
+    principal: t.Optional[str] = None
+) -> t.Optional[dict]:
+    """
+    Finds the ticket-granting ticket (TGT) of a principal in a parsed
+    credential cache.
+
+    :param ccache: dictionary object returned by ``read_ccache``.
+    :param principal: Kerberos principal, defaults to the default
+        principal of the credential cache.
+    :return: dictionary object of the TGT with the latest end time,
+        otherwise None.
+    """
+    principal = principal or ccache["default_principal"]
+    realm = principal.rsplit("@", 1)[-1]
+    tgts = [
+        cred for cred in ccache["credentials"]
+        if cred["client"] == principal
+        and cred["server"] == f"krbtgt/{realm}@{realm}"
+    ]
+    return max(tgts, key=lambda cred: cred["endtime"]) if tgts else None
@@ -10,3 +10,31 @@ class KtutilCommandNotFound(RuntimeError):
     Raised when ``ktutil`` command-line interface not found.
     """
     pass
+
+
+class KeytabFormatError(RuntimeError):
+    """
+    Raised when a Kerberos keytab file cannot be parsed.
+    """
+    pass
+
+
+class KtutilSessionError(RuntimeError):
+    """
+    Raised when a ``ktutil`` session is closed or exits unexpectedly.
+    """
+    pass
+
+
+class KtutilTimeout(RuntimeError):
+    """
+    Raised when a ``ktutil`` command doesn't complete in time.
+    """
+    pass
+
+
+class CcacheFormatError(RuntimeError):
+    """
+    Raised when a Kerberos credential cache file cannot be parsed.
+    """
+    pass
@@ -0,0 +1,359 @@
+import typing as t
+import array
+
+from krb5ticket.keytab import (
+    enctype_number,
+    iter_entries,
+    parse_principal,
+    unparse_principal
+)
+
+
+class KeytabEntry:
+    """
+    Single Kerberos keytab entry.
+
+    :param components: principal components.
+    :param realm: Kerberos realm.
+    :param name_type: principal name type.
+    :param timestamp: time the key was written, in seconds since the epoch.
+    :param kvno: key version number.
+    :param enctype: encryption type number.
+    :param key: key material.
+    :param slot: keylist slot number, if the entry was read from a keytab.
+    """
+    __slots__ = ("components", "realm", "name_type", "timestamp", "kvno",
+                 "enctype", "key", "slot")
+
+    def __init__(
+        self,
+        components: t.Sequence[str],
+        realm: str,
+        name_type: int,
+        timestamp: int,
+        kvno: int,
+        enctype: int,
+        key: bytes,
+        slot: t.Optional[int] = None
+    ) -> None:
+        self.components = tuple(components)
+        self.realm = realm
+        self.name_type = name_type
+        self.timestamp = timestamp
+        self.kvno = kvno
+        self.enctype = enctype
+        self.key = key
+        self.slot = slot
+
+    def __repr__(self) -> str:
+        return (f"KeytabEntry(principal={self.principal!r}, "
+                f"kvno={self.kvno}, enctype={self.enctype}, slot={self.slot})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, KeytabEntry):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    @property
+    def principal(self) -> str:
+        """
+        Gets the Kerberos principal of the entry.
+        """
+        return unparse_principal(self.components, self.realm)
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "KeytabEntry":
+        """
+        Builds an entry from a dictionary object returned by the
+        ``krb5ticket.keytab`` parsers.
+
+        :param entry: dictionary object containing the entry.
+        :return: ``KeytabEntry`` object.
+        """
+        return cls(
+            entry["components"], entry["realm"], entry.get("name_type", 1),
+            entry.get("timestamp", 0), entry["kvno"], entry["enctype"],
+            bytes(entry["key"]), entry.get("slot"))
+
+    def as_dict(self) -> dict:
+        """
+        Converts the entry to a dictionary object, as accepted by
+        ``krb5ticket.keytab.write_keytab``.
+
+        :return: dictionary object containing the entry.
+        """
+        return {
+            "kvno": self.kvno,
+            "principal": self.principal,
+            "realm": self.realm,
+            "components": list(self.components),
+            "name_type": self.name_type,
+            "timestamp": self.timestamp,
+            "enctype": self.enctype,
+            "key": self.key,
+            "slot": self.slot,
+        }
+
+
+class Keylist:
+    """
+    Compact, column-oriented list of Kerberos keytab entries.
+
+    Numeric fields are stored in ``array`` columns, principals are
+    interned once per distinct principal and all keys share a single
+    buffer, so an entry costs a few dozen bytes plus its key instead of
+    a dictionary. ``KeytabEntry`` objects are built on access.
+
+    Entries are indexed by principal, by principal and kvno, by enctype
+    and by slot as they are appended, so lookups don't scan the keylist.
+
+    :param entries: ``KeytabEntry`` objects, or dictionary objects as
+        returned by the ``krb5ticket.keytab`` parsers.
+    """
+    def __init__(
+        self,
+        entries: t.Iterable[t.Union[KeytabEntry, dict]] = ()
+    ) -> t.NoReturn:
+        self._principals = []
+        self._principal_ids = {}
+        self._principal = array.array("L")
+        self._name_type = array.array("l")
+        self._timestamp = array.array("L")
+        self._kvno = array.array("L")
+        self._enctype = array.array("l")
+        self._slot = array.array("L")
+        self._key_offsets = array.array("Q", [0])
+        self._keys = bytearray()
+        self._by_principal = {}
+        self._by_principal_kvno = {}
+        self._by_enctype = {}
+        self._by_slot = {}
+        self._latest_kvno = {}
+        self.extend(entries)
+
+    @classmethod
+    def from_file(cls, keytab_file: str) -> "Keylist":
+        """
+        Reads all entries of a Kerberos V5 keytab file.
+
+        :param keytab_file: Kerberos V5 keytab file.
+        :return: ``Keylist`` object.
+        :raises: ``KeytabFormatError`` if the file is not a valid keytab.
+        """
+        return cls(iter_entries(keytab_file))
+
+    def __len__(self) -> int:
+        return len(self._kvno)
+
+    def __iter__(self) -> t.Iterator[KeytabEntry]:
+        for index in range(len(self)):
+            yield self._entry(index)
+
+    def __getitem__(self, index: int) -> KeytabEntry:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("keylist index out of range")
+        return self._entry(index)
+
+    def __repr__(self) -> str:
+        return f"Keylist({len(self)} entries)"
+
+    def _entry(self, index: int) -> KeytabEntry:
+        components, realm = self._principals[self._principal[index]]
+        slot = self._slot[index]
+        return KeytabEntry(
+            components, realm, self._name_type[index],
+            self._timestamp[index], self._kvno[index], self._enctype[index],
+            bytes(self._keys[
+                self._key_offsets[index]:self._key_offsets[index + 1]]),
+            slot or None)
+
+    def append(self, entry: t.Union[KeytabEntry, dict]) -> None:
+        """
+        Appends an entry.
+
+        :param entry: ``KeytabEntry`` object, or dictionary object as
+            returned by the ``krb5ticket.keytab`` parsers.
+        """
+        if isinstance(entry, dict):
+            entry = KeytabEntry.from_dict(entry)
+        principal = (entry.components, entry.realm)
+        principal_id = self._principal_ids.get(principal)
+        if principal_id is None:
+            principal_id = self._principal_ids[principal] = \
+                len(self._principals)
+            self._principals.append(principal)
+        index = len(self)
+        for column, value in (
+                (self._by_principal, principal_id),
+                (self._by_principal_kvno, (principal_id, entry.kvno)),
+                (self._by_enctype, entry.enctype)):
+            indexes = column.get(value)
+            if indexes is None:
+                indexes = column[value] = array.array("L")
+            indexes.append(index)
+        if entry.slot and entry.slot != index + 1:
+            # Slots read from a keytab follow the entry order; only the
+            # others need to be indexed.
+            self._by_slot[entry.slot] = index
+        if entry.kvno > self._latest_kvno.get(principal_id, -1):
+            self._latest_kvno[principal_id] = entry.kvno
+        self._principal.append(principal_id)
+        self._name_type.append(entry.name_type)
+        self._timestamp.append(entry.timestamp)
+        self._kvno.append(entry.kvno)
+        self._enctype.append(entry.enctype)
+        self._slot.append(entry.slot or 0)
+        self._keys += entry.key
+        self._key_offsets.append(len(self._keys))
+
+    def extend(self, entries: t.Iterable[t.Union[KeytabEntry, dict]]) -> None:
+        """
+        Appends many entries.
+
+        :param entries: ``KeytabEntry`` objects, or dictionary objects as
+            returned by the ``krb5ticket.keytab`` parsers.
+        """
+        for entry in entries:
+            self.append(entry)
+
+    @property
+    def principals(self) -> t.List[str]:
+        """
+        Gets the distinct Kerberos principals, in order of appearance.
+        """
+        return [unparse_principal(components, realm)
+                for components, realm in self._principals]
+
+    @property
+    def kvnos(self) -> array.array:
+        """
+        Gets the key version number column.
+        """
+        return self._kvno
+
+    @property
+    def enctypes(self) -> array.array:
+        """
+        Gets the encryption type column.
+        """
+        return self._enctype
+
+    @property
+    def slots(self) -> array.array:
+        """
+        Gets the slot number column, 0 for entries without a slot.
+        """
+        return self._slot
+
+    def as_dicts(self) -> t.List[dict]:
+        """
+        Converts the entries to dictionary objects, as accepted by
+        ``krb5ticket.keytab.write_keytab``.
+
+        :return: list of dictionary objects containing the entries.
+        """
+        return [entry.as_dict() for entry in self]
+
+    def _principal_id(self, principal: str) -> t.Optional[int]:
+        components, realm = parse_principal(principal)
+        return self._principal_ids.get((tuple(components), realm))
+
+    def _indexes(
+        self,
+        principal: t.Optional[str] = None,
+        kvno: t.Optional[int] = None,
+        enctypes: t.Optional[t.Iterable[t.Union[str, int]]] = None
+    ) -> t.List[int]:
+        """
+        Gets the indexes of the entries matching every given criterion,
+        using the narrowest index available.
+        """
+        if principal is not None:
+            principal_id = self._principal_id(principal)
+            if principal_id is None:
+                return []
+            indexes = self._by_principal_kvno.get((principal_id, kvno), []) \
+                if kvno is not None else self._by_principal[principal_id]
+            kvno = None
+        elif kvno is not None:
+            indexes = [i for i, value in enumerate(self._kvno) if value == kvno]
+            kvno = None
+        elif enctypes is not None:
+            numbers = {enctype_number(enctype) for enctype in enctypes}
+            return sorted(i for number in numbers
+                          for i in self._by_enctype.get(number, ()))
+        else:
+            return list(range(len(self)))
+
+        if enctypes is not None:
+            numbers = {enctype_number(enctype) for enctype in enctypes}
+            indexes = [i for i in indexes if self._enctype[i] in numbers]
+        return list(indexes)
+
+    def latest_kvno(self, principal: str) -> t.Optional[int]:
+        """
+        Gets the highest key version number of a principal.
+
+        :param principal: Kerberos principal.
+        :return: key version number, otherwise None if the principal has
+            no entry.
+        """
+        principal_id = self._principal_id(principal)
+        return None if principal_id is None \
+            else self._latest_kvno[principal_id]
+
+    def entries_for(
+        self,
+        principal: str,
+        kvno: t.Optional[int] = None,
+        enctypes: t.Optional[t.Iterable[t.Union[str, int]]] = None
+    ) -> t.List[KeytabEntry]:
+        """
+        Gets the entries of a principal.
+
+        :param principal: Kerberos principal.
+        :param kvno: key version number to match, defaults to any.
+        :param enctypes: encryption type names or numbers to match,
+            defaults to any.
+        :return: list of ``KeytabEntry`` objects, in keylist order.
+        """
+        return [self._entry(i)
+                for i in self._indexes(principal, kvno, enctypes)]
+
+    def entry_at(self, slot: int) -> t.Optional[KeytabEntry]:
+        """
+        Gets the entry in a slot.
+
+        :param slot: keylist slot number.
+        :return: ``KeytabEntry`` object, otherwise None.
+        """
+        index = slot - 1
+        if not (0 <= index < len(self) and self._slot[index] == slot):
+            index = self._by_slot.get(slot)
+        return None if index is None else self._entry(index)
+
+    def slots_where(
+        self,
+        principal: t.Optional[str] = None,
+        kvno: t.Optional[int] = None,
+        enctypes: t.Optional[t.Iterable[t.Union[str, int]]] = None,
+        predicate: t.Optional[t.Callable[[KeytabEntry], bool]] = None
+    ) -> t.Set[int]:
+        """
+        Gets the slots of the entries matching every given criterion.
+
+        :param principal: Kerberos principal to match, defaults to any.
+        :param kvno: key version number to match, defaults to any.
+        :param enctypes: encryption type names or numbers to match,
+            defaults to any.
+        :param predicate: function called with each remaining
+            ``KeytabEntry`` object, returning whether or not it matches.
+        :return: set of slot numbers.
+        """
+        indexes = self._indexes(principal, kvno, enctypes)
+        if predicate is not None:
+            indexes = [i for i in indexes if predicate(self._entry(i))]
+        return {self._slot[i] for i in indexes if self._slot[i]}
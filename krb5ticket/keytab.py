@@ -0,0 +1,551 @@
+import typing as t
+import os
+import mmap
+import time
+import struct
+import pathlib
+import tempfile
+import threading
+import contextlib
+import collections
+
+from krb5ticket.errors import KeytabFormatError
+
+
+KEYTAB_MAGIC = 0x05
+KEYTAB_V1 = 0x01
+KEYTAB_V2 = 0x02
+
+#: Kerberos encryption type numbers and their MIT names.
+ENCTYPES = {
+    1: "des-cbc-crc",
+    2: "des-cbc-md4",
+    3: "des-cbc-md5",
+    16: "des3-cbc-sha1",
+    17: "aes128-cts-hmac-sha1-96",
+    18: "aes256-cts-hmac-sha1-96",
+    19: "aes128-cts-hmac-sha256-128",
+    20: "aes256-cts-hmac-sha384-192",
+    23: "arcfour-hmac",
+    24: "arcfour-hmac-exp",
+    25: "camellia128-cts-cmac",
+    26: "camellia256-cts-cmac",
+}
+
+#: Kerberos encryption type names (including MIT aliases) and their numbers.
+ENCTYPE_NUMBERS = {
+    **{name: number for number, name in ENCTYPES.items()},
+    "des3-cbc-sha1-kd": 16,
+    "des3-hmac-sha1": 16,
+    "aes128-cts": 17,
+    "aes128-sha1": 17,
+    "aes256-cts": 18,
+    "aes256-sha1": 18,
+    "aes128-sha2": 19,
+    "aes256-sha2": 20,
+    "rc4-hmac": 23,
+    "arcfour-hmac-md5": 23,
+    "rc4-hmac-exp": 24,
+    "arcfour-hmac-md5-exp": 24,
+    "camellia128-cts": 25,
+    "camellia256-cts": 26,
+}
+
+#: Key lengths in bytes for each Kerberos encryption type number.
+KEY_LENGTHS = {
+    1: 8,
+    2: 8,
+    3: 8,
+    16: 24,
+    17: 16,
+    18: 32,
+    19: 16,
+    20: 32,
+    23: 16,
+    24: 16,
+    25: 16,
+    26: 32,
+}
+
+
+def enctype_number(enctype: t.Union[str, int]) -> t.Optional[int]:
+    """
+    Resolves a Kerberos encryption type to its number.
+
+    :param enctype: encryption type name (e.g. "aes256-cts-hmac-sha1-96",
+        optionally followed by ":salttype") or number.
+    :return: encryption type number, otherwise None if unknown.
+    """
+    if isinstance(enctype, int):
+        return enctype if enctype in ENCTYPES else None
+    return ENCTYPE_NUMBERS.get(enctype.split(":", 1)[0].strip().lower())
+
+
+def parse_principal(principal: str) -> t.Tuple[t.List[str], t.Optional[str]]:
+    """
+    Splits a Kerberos principal into its components and realm.
+
+    Backslash-escaped "/" and "@" characters are kept within their
+    component.
+
+    :param principal: Kerberos principal (e.g. "host/fqdn@EXAMPLE.COM").
+    :return: tuple of the principal components and the realm, the realm
+        being None when the principal doesn't have one.
+    """
+    components = []
+    realm = None
+    current = []
+    chars = iter(principal)
+    for char in chars:
+        if char == "\\":
+            current.append(next(chars, ""))
+        elif char == "/" and realm is None:
+            components.append("".join(current))
+            current = []
+        elif char == "@" and realm is None:
+            components.append("".join(current))
+            current = []
+            realm = ""
+        else:
+            current.append(char)
+    if realm is None:
+        components.append("".join(current))
+    else:
+        realm = "".join(current)
+    return components, realm
+
+
+def unparse_principal(components: t.List[str], realm: str) -> str:
+    """
+    Joins principal components and realm into a Kerberos principal.
+
+    :param components: principal components.
+    :param realm: Kerberos realm.
+    :return: Kerberos principal, with "/" and "@" escaped within
+        components.
+    """
+    escaped = [
+        component.replace("\\", "\\\\").replace("/", "\\/").replace("@", "\\@")
+        for component in components
+    ]
+    return "/".join(escaped) + "@" + realm
+
+
+def _read_data(
+    data: t.Union[bytes, memoryview],
+    offset: int,
+    byteorder: str
+) -> t.Tuple[bytes, int]:
+    """
+    Reads a counted octet string from a keytab record.
+
+    :param data: raw keytab content.
+    :param offset: offset of the 16-bit length prefix.
+    :param byteorder: ``struct`` byte order character.
+    :return: tuple of the octet string and the offset following it.
+    """
+    (length,) = struct.unpack_from(f"{byteorder}H", data, offset)
+    offset += 2
+    return data[offset:offset + length], offset + length
+
+
+def _parse_entry(
+    data: t.Union[bytes, memoryview],
+    offset: int,
+    end: int,
+    version: int,
+    byteorder: str
+) -> dict:
+    """
+    Parses a single keytab record.
+
+    :param data: raw keytab content.
+    :param offset: offset of the first byte of the record.
+    :param end: offset following the last byte of the record.
+    :param version: keytab file format version.
+    :param byteorder: ``struct`` byte order character.
+    :return: dictionary object containing the entry.
+    """
+    (count,) = struct.unpack_from(f"{byteorder}H", data, offset)
+    offset += 2
+    if version == KEYTAB_V1:
+        # Version 1 counts the realm as a component.
+        count -= 1
+
+    realm, offset = _read_data(data, offset, byteorder)
+    components = []
+    for _ in range(count):
+        component, offset = _read_data(data, offset, byteorder)
+        components.append(str(component, "UTF-8", "surrogateescape"))
+
+    if version == KEYTAB_V1:
+        name_type = 1  # KRB5_NT_PRINCIPAL
+    else:
+        (name_type,) = struct.unpack_from(f"{byteorder}I", data, offset)
+        offset += 4
+
+    timestamp, kvno, enctype = struct.unpack_from(
+        f"{byteorder}IBH", data, offset)
+    offset += 7
+    key, offset = _read_data(data, offset, byteorder)
+    if offset > end:
+        raise KeytabFormatError("Kerberos keytab entry is truncated.")
+
+    # Newer writers append the full 32-bit kvno after the key.
+    if end - offset >= 4:
+        (kvno32,) = struct.unpack_from(f"{byteorder}I", data, offset)
+        if kvno32:
+            kvno = kvno32
+
+    realm = str(realm, "UTF-8", "surrogateescape")
+    return {
+        "kvno": kvno,
+        "principal": unparse_principal(components, realm),
+        "realm": realm,
+        "components": components,
+        "name_type": name_type,
+        "timestamp": timestamp,
+        "enctype": enctype,
+        "key": key,
+    }
+
+
+def parse_keytab(data: t.Union[bytes, memoryview]) -> t.Iterator[dict]:
+    """
+    Parses the content of a Kerberos V5 keytab file.
+
+    Both the version 1 (native byte order) and version 2 (big-endian)
+    MIT keytab formats are supported. Entries are numbered by slot in
+    the same order ``ktutil`` would list them. Keys are slices of
+    ``data``, so they are ``memoryview`` objects when ``data`` is one.
+
+    :param data: raw keytab content.
+    :return: iterator of dictionary objects containing the entries.
+    :raises: ``KeytabFormatError`` if the content is not a valid keytab.
+    """
+    if len(data) < 2 or data[0] != KEYTAB_MAGIC \
+            or data[1] not in (KEYTAB_V1, KEYTAB_V2):
+        raise KeytabFormatError("Unsupported Kerberos keytab format.")
+
+    version = data[1]
+    byteorder = ">" if version == KEYTAB_V2 else "="
+    offset = 2
+    slot = 0
+    try:
+        while offset + 4 <= len(data):
+            (size,) = struct.unpack_from(f"{byteorder}i", data, offset)
+            offset += 4
+            if size == 0:
+                break
+            if size < 0:
+                # Negative sizes mark holes left by deleted entries.
+                offset += -size
+                continue
+            end = offset + size
+            if end > len(data):
+                raise KeytabFormatError("Kerberos keytab entry is truncated.")
+            entry = _parse_entry(data, offset, end, version, byteorder)
+            slot += 1
+            entry["slot"] = slot
+            yield entry
+            offset = end
+    except struct.error as e:
+        raise KeytabFormatError(f"Kerberos keytab entry is malformed: {e}")
+
+
+def read_keytab(keytab_file: str) -> t.List[dict]:
+    """
+    Reads all entries of a Kerberos V5 keytab file.
+
+    The file is parsed natively, without the ``ktutil`` command-line
+    interface.
+
+    :param keytab_file: Kerberos V5 keytab file.
+    :return: list of dictionary objects containing the entries.
+    :raises: ``KeytabFormatError`` if the file is not a valid keytab.
+    """
+    with open(keytab_file, "rb") as fh:
+        return list(parse_keytab(fh.read()))
+
+
+def iter_entries(keytab_file: str) -> t.Iterator[dict]:
+    """
+    Iterates lazily over the entries of a Kerberos V5 keytab file.
+
+    The keytab is memory-mapped and parsed one entry at a time, so memory
+    use doesn't grow with the size of the keytab. Keys are ``memoryview``
+    slices of the mapping rather than copies; they stay valid while
+    referenced, and ``bytes(entry["key"])`` copies one out.
+
+    :param keytab_file: Kerberos V5 keytab file.
+    :return: iterator of dictionary objects containing the entries.
+    :raises: ``KeytabFormatError`` if the file is not a valid keytab.
+    """
+    with open(keytab_file, "rb") as fh:
+        try:
+            data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped.
+            raise KeytabFormatError("Kerberos keytab is empty.")
+    view = memoryview(data)
+    try:
+        yield from parse_keytab(view)
+    finally:
+        view.release()
+        try:
+            data.close()
+        except BufferError:
+            # Keys are still referenced; the mapping is closed once they
+            # are garbage collected.
+            pass
+
+
+class KeytabCache:
+    """
+    Bounded LRU cache of Kerberos V5 keytab metadata.
+
+    Keytabs are cached by resolved path, inode, modification time and
+    size, so a cached keytab is only returned while the file is unchanged
+    and looking it up costs a ``stat`` instead of a full parse. Only the
+    fields in ``FIELDS`` are kept; key material is never cached.
+
+    :param maxsize: maximum number of keytabs kept in the cache.
+    """
+    FIELDS = ("slot", "kvno", "principal", "enctype")
+
+    def __init__(self, maxsize: int = 256) -> t.NoReturn:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(path: str, stat: os.stat_result) -> tuple:
+        return path, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def read(self, keytab_file: str) -> t.Tuple[dict, ...]:
+        """
+        Reads the metadata of all entries of a Kerberos V5 keytab file
+        through the cache.
+
+        The returned entries are shared between callers and must not be
+        modified.
+
+        :param keytab_file: Kerberos V5 keytab file.
+        :return: tuple of dictionary objects with the keys in ``FIELDS``.
+        :raises: ``KeytabFormatError`` if the file is not a valid keytab.
+        """
+        path = os.path.realpath(keytab_file)
+        key = self._key(path, os.stat(path))
+        with self._lock:
+            entries = self._entries.get(key)
+            if entries is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entries
+            self.misses += 1
+
+        with open(path, "rb") as fh:
+            # Key the entries by the file that was actually read, in case
+            # it was replaced since the first ``stat``.
+            key = self._key(path, os.fstat(fh.fileno()))
+            entries = tuple(
+                {field: entry[field] for field in self.FIELDS}
+                for entry in parse_keytab(fh.read()))
+
+        with self._lock:
+            for stale in [k for k in self._entries if k[0] == path]:
+                del self._entries[stale]
+            self._entries[key] = entries
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entries
+
+    def invalidate(self, keytab_file: t.Optional[str] = None) -> None:
+        """
+        Drops a keytab, or every keytab, from the cache.
+
+        :param keytab_file: Kerberos V5 keytab file, or None to clear the
+            whole cache.
+        """
+        with self._lock:
+            if keytab_file is None:
+                self._entries.clear()
+                return
+            path = os.path.realpath(keytab_file)
+            for stale in [k for k in self._entries if k[0] == path]:
+                del self._entries[stale]
+
+
+#: Shared keytab cache, used by ``ktutil_helpers``.
+KEYTAB_CACHE = KeytabCache()
+
+
+def _write_data(value: t.Union[str, bytes]) -> bytes:
+    """
+    Serializes a counted octet string for a keytab record.
+
+    :param value: string or bytes to serialize.
+    :return: serialized octet string.
+    """
+    if isinstance(value, str):
+        value = value.encode("UTF-8", "surrogateescape")
+    return struct.pack(">H", len(value)) + value
+
+
+def serialize_entry(entry: dict) -> bytes:
+    """
+    Serializes a single entry as a version 2 keytab record.
+
+    :param entry: dictionary object containing the entry with keys
+        ``principal`` (or ``components`` and ``realm``), ``kvno``,
+        ``enctype`` and ``key``, and optionally ``name_type`` and
+        ``timestamp``.
+    :return: serialized record, including its size prefix.
+    """
+    if "components" in entry:
+        components, realm = entry["components"], entry["realm"]
+    else:
+        components, realm = parse_principal(entry["principal"])
+    if not realm:
+        raise ValueError(
+            f"Kerberos principal '{entry.get('principal')}' has no realm.")
+
+    kvno = entry["kvno"]
+    record = b"".join([
+        struct.pack(">H", len(components)),
+        _write_data(realm),
+        b"".join(_write_data(component) for component in components),
+        struct.pack(
+            ">IIBH",
+            entry.get("name_type", 1),
+            entry.get("timestamp", int(time.time())),
+            kvno & 0xFF,
+            entry["enctype"]),
+        _write_data(bytes(entry["key"])),
+        struct.pack(">I", kvno),
+    ])
+    return struct.pack(">i", len(record)) + record
+
+
+class _Unchanged(Exception):
+    """
+    Raised within ``_rewrite`` to leave the keytab file untouched.
+    """
+
+
+@contextlib.contextmanager
+def _rewrite(keytab_file: str) -> t.Iterator[t.BinaryIO]:
+    """
+    Rewrites a Kerberos V5 keytab file atomically.
+
+    Yields a temporary file within the directory of the keytab file,
+    following symbolic links, positioned after the version 2 header. On
+    exit the file is synced, given the mode and owner of the keytab file
+    and renamed over it, and the directory is synced, so readers never
+    see a partially written keytab. The temporary file is removed if the
+    context raises.
+
+    :param keytab_file: Kerberos V5 keytab file.
+    :return: iterator over the temporary file object.
+    """
+    path = pathlib.Path(os.path.realpath(keytab_file))
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        st = None
+
+    fd, temp_file = tempfile.mkstemp(
+        prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(bytes((KEYTAB_MAGIC, KEYTAB_V2)))
+            yield fh
+            fh.flush()
+            os.fsync(fh.fileno())
+        if st is not None:
+            if (st.st_uid, st.st_gid) != (os.geteuid(), os.getegid()):
+                os.chown(temp_file, st.st_uid, st.st_gid)
+            os.chmod(temp_file, st.st_mode & 0o7777)
+        os.replace(temp_file, str(path))
+    except BaseException as e:
+        try:
+            os.unlink(temp_file)
+        except FileNotFoundError:
+            pass
+        if not isinstance(e, _Unchanged):
+            raise
+        return
+
+    dir_fd = os.open(str(path.parent), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def write_keytab(
+    keytab_file: str,
+    entries: t.Iterable[dict],
+    append: bool = False
+) -> None:
+    """
+    Writes entries to a Kerberos V5 keytab file.
+
+    The keytab is written natively in the version 2 format, without the
+    ``ktutil`` command-line interface. The content is written to a
+    temporary file within the same directory, synced, then renamed over
+    the keytab file so readers never see a partially written keytab.
+
+    :param keytab_file: Kerberos V5 keytab file.
+    :param entries: dictionary objects containing the entries, as
+        accepted by ``serialize_entry``.
+    :param append: whether or not to keep the entries of an existing
+        keytab file ahead of the new entries. When False, an existing
+        keytab file is rewritten.
+    :return: None
+    :raises: ``KeytabFormatError`` if the existing keytab file cannot be
+        parsed when appending.
+    """
+    append = append and os.path.exists(keytab_file)
+    with _rewrite(keytab_file) as fh:
+        if append:
+            for entry in iter_entries(keytab_file):
+                fh.write(serialize_entry(entry))
+        for entry in entries:
+            fh.write(serialize_entry(entry))
+
+
+def delete_keytab_entries(
+    keytab_file: str,
+    predicate: t.Callable[[dict], bool]
+) -> int:
+    """
+    Deletes the entries of a Kerberos V5 keytab file matching a predicate.
+
+    The keytab is read and the remaining entries are written in a single
+    sequential pass, then the keytab is replaced atomically as with
+    ``write_keytab``. Slots are those of the keytab before any deletion,
+    so deleting several entries never shifts the ones still to delete.
+    The keytab file is left untouched when no entry matches.
+
+    :param keytab_file: Kerberos V5 keytab file.
+    :param predicate: function called with each entry, as returned by
+        ``parse_keytab``, returning whether or not to delete it.
+    :return: number of deleted entries.
+    :raises: ``KeytabFormatError`` if the file is not a valid keytab.
+    """
+    deleted = 0
+    with _rewrite(keytab_file) as fh:
+        for entry in iter_entries(keytab_file):
+            if predicate(entry):
+                deleted += 1
+            else:
+                fh.write(serialize_entry(entry))
+        if not deleted:
+            raise _Unchanged()
+    return deleted
@@ -1,12 +1,85 @@
 import gssapi
 import typing as t
+import os
+import time
+import ctypes
+import ctypes.util
 import datetime
 import pathlib
+import uuid
 import logging
-import shutil
-import tempfile
+import concurrent.futures
 
-from krb5ticket import KeytabFileNotExists
+from krb5ticket import metrics, tracing
+from krb5ticket.ccache import find_tgt, read_ccache
+from krb5ticket.errors import CcacheFormatError, KeytabFileNotExists
+from krb5ticket.singleflight import SingleFlight
+
+
+# Process-wide, so concurrent acquisitions for the same principal, keytab
+# and credential cache reach the KDC once whichever object starts them.
+_acquisitions = SingleFlight()
+
+
+def _memory_ccache() -> str:
+    """
+    Gets a new in-memory credential cache name for an intermediate
+    acquisition.
+
+    GSSAPI only asks the KDC for a new TGT when the credential cache holds
+    none, or one past its refresh time, so every acquisition starts from
+    an empty cache.
+
+    :return: ``MEMORY:`` credential cache name.
+    """
+    return f"MEMORY:krb5ticket-{uuid.uuid4().hex}"
+
+
+def _destroy_ccache(name: str) -> bool:
+    """
+    Destroys a credential cache with the Kerberos library.
+
+    GSSAPI has no call to destroy a credential cache, and ``MEMORY:``
+    caches otherwise live until the process exits.
+
+    :param name: credential cache name.
+    :return: True on success, otherwise False.
+    """
+    try:
+        lib = ctypes.CDLL(ctypes.util.find_library("krb5") or "libkrb5.so.3")
+        context, ccache = ctypes.c_void_p(), ctypes.c_void_p()
+        if lib.krb5_init_context(ctypes.byref(context)):
+            return False
+    except (OSError, AttributeError) as e:
+        logging.debug(f"KRB ccache {name} not destroyed: {e}")
+        return False
+    try:
+        if lib.krb5_cc_resolve(
+                context, name.encode("UTF-8"), ctypes.byref(ccache)):
+            return False
+        return lib.krb5_cc_destroy(context, ccache) == 0
+    finally:
+        lib.krb5_free_context(context)
+
+
+def _record_error(operation: str, error: Exception) -> None:
+    """
+    Counts a failed Kerberos operation by error class.
+
+    :param operation: name of the failed operation.
+    :param error: exception raised by the operation.
+    """
+    if isinstance(error, gssapi.exceptions.ExpiredCredentialsError):
+        error_class = "expired"
+    elif isinstance(error, gssapi.exceptions.MissingCredentialsError):
+        error_class = "missing"
+    elif isinstance(error, gssapi.exceptions.InvalidCredentialsError):
+        error_class = "invalid"
+    else:
+        error_class = "gss_error"
+    metrics.increment(
+        "krb5ticket_errors_total",
+        labels={"operation": operation, "error": error_class})
 
 
 class Krb5:
@@ -25,11 +98,27 @@ class Krb5:
         passes a plain text password. To initialize credentials, 
         please use ``acquire_with_keytab``.
 
+    Acquired credentials are kept in memory together with their expiry
+    and the state of the credential cache file, so ``is_expired`` only
+    calls GSSAPI again once the ticket is within ``refresh_margin``
+    seconds of expiring or the credential cache file has changed.
+
     :param principal: Kerberos principal.
     :param ccache: Kerberos credential cache.
+    :param refresh_margin: number of seconds before expiry at which the
+        in-memory credentials are no longer trusted.
     """
-    def __init__(self, principal: str, ccache: str = None) -> t.NoReturn:
+    def __init__(
+        self,
+        principal: str,
+        ccache: str = None,
+        refresh_margin: int = 60
+    ) -> t.NoReturn:
         self._store = {}
+        self._creds = None
+        self._expires_at = None
+        self._service_tickets = {}
+        self.refresh_margin = refresh_margin
         self.principal = principal
         self.ccache = ccache
 
@@ -47,6 +136,7 @@ class Krb5:
         """
         self._principal = gssapi.Name(
             principal, gssapi.NameType.kerberos_principal)
+        self.invalidate()
 
     @property
     def ccache(self) -> t.Union[None, dict]:
@@ -61,6 +151,7 @@ class Krb5:
         Sets Kerberos credential cache.
         """
         self._ccache = {"ccache": ccache} if ccache else None
+        self.invalidate()
 
     @property
     def keytab(self) -> str:
@@ -103,14 +194,157 @@ class Krb5:
         """
         if isinstance(seconds, int):
             self._lifetime = datetime.datetime.now() + datetime.timedelta(0, seconds)
+            self._expires_at = time.monotonic() + seconds
         else:
             self._lifetime = None
+            self._expires_at = None
+
+    @property
+    def ccache_file(self) -> t.Optional[str]:
+        """
+        Gets the path of the Kerberos credential cache file.
+
+        Only credential caches named explicitly, or through ``KRB5CCNAME``,
+        are considered: the default credential cache of krb5.conf may be
+        of another type, such as ``KEYRING:`` or ``KCM:``.
+
+        :return: path of the ``FILE:`` credential cache in use, otherwise
+            None for other or unknown credential cache types.
+        """
+        name = self.ccache["ccache"] if self.ccache \
+            else os.environ.get("KRB5CCNAME")
+        if not name:
+            return None
+        if name.startswith("FILE:"):
+            return name[5:]
+        if ":" in name.split("/", 1)[0]:
+            return None
+        return name
+
+    def _ccache_state(self) -> t.Optional[tuple]:
+        """
+        Gets the identity and modification time of the credential cache
+        file.
+
+        :return: tuple of the device, inode and modification time of the
+            credential cache file, otherwise None.
+        """
+        ccache_file = self.ccache_file
+        if not ccache_file:
+            return None
+        try:
+            st = os.stat(ccache_file)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino, st.st_mtime_ns
+
+    def _ccache_remaining(self) -> t.Optional[int]:
+        """
+        Gets the remaining lifetime of the principal's ticket-granting
+        ticket (TGT) from the credential cache file, without GSSAPI.
+
+        The end time of the TGT is kept with the state of the credential
+        cache file, so the file is only parsed again once it changes.
+
+        :return: remaining seconds, otherwise None when the credential
+            cache isn't a readable ``FILE:`` cache holding a TGT for the
+            principal.
+        """
+        state = self._ccache_state()
+        if state is None:
+            return None
+        cached_state, endtime = self._ccache_tgt
+        if state != cached_state:
+            try:
+                tgt = find_tgt(
+                    read_ccache(self.ccache_file), str(self.principal))
+            except (OSError, CcacheFormatError):
+                return None
+            endtime = tgt["endtime"] if tgt is not None else None
+            self._ccache_tgt = (state, endtime)
+        if endtime is None:
+            return None
+        return endtime - int(time.time())
+
+    def _remember(self, creds: gssapi.Credentials) -> None:
+        """
+        Keeps acquired credentials in memory.
+
+        :param creds: ``gssapi.Credentials`` object.
+        """
+        self._creds = creds
+        self._creds_state = self._ccache_state()
+
+    def invalidate(self) -> None:
+        """
+        Forgets the in-memory credentials, so the next check calls GSSAPI.
+        """
+        self._creds = None
+        self._creds_state = None
+        self._ccache_tgt = (None, None)
+
+    def _cached_creds(self) -> t.Optional[gssapi.Credentials]:
+        """
+        Gets the in-memory credentials while they can be trusted.
+
+        :return: ``gssapi.Credentials`` object, otherwise None when no
+            credentials are kept, they are about to expire or the
+            credential cache file has changed.
+        """
+        creds = self._creds
+        expires_at = self._expires_at
+        if creds is None or expires_at is None:
+            return None
+        if time.monotonic() >= expires_at - self.refresh_margin:
+            return None
+        if self._ccache_state() != self._creds_state:
+            return None
+        return creds
+
+    @property
+    def remaining_lifetime(self) -> t.Optional[float]:
+        """
+        Gets the number of seconds until the known credentials expire.
+
+        :return: remaining seconds, measured with a monotonic clock,
+            otherwise None if no credentials were acquired yet.
+        """
+        if self._expires_at is None:
+            return None
+        return self._expires_at - time.monotonic()
+
+    def expires_within(self, seconds: float = 0) -> bool:
+        """
+        Checks whether the Kerberos credentials expire within a number of
+        seconds.
+
+        This is the fast counterpart of ``is_expired``: it is answered
+        from the known absolute expiry with a monotonic clock, without
+        calling GSSAPI or checking the credential cache file. GSSAPI is
+        only called when no expiry is known yet.
+
+        :param seconds: number of seconds from now; 0 checks whether the
+            credentials are already expired.
+        :return: True when the credentials expire within the given number
+            of seconds or are missing, otherwise False.
+        """
+        if self._expires_at is None and not self._acquire_default():
+            return True
+        remaining = self.remaining_lifetime
+        return remaining is None or remaining <= seconds
 
     @property
     def is_expired(self) -> str:
         """
         Gets the Kerberos credential expiry state.
         """
+        if self._cached_creds() is not None:
+            return False
+        # A valid TGT in the credential cache file answers without GSSAPI.
+        remaining = self._ccache_remaining()
+        if remaining is not None and remaining > self.refresh_margin:
+            self.lifetime = remaining
+            return False
         try:
             creds = self._acquire_default()
         except gssapi.exceptions.ExpiredCredentialsError:
@@ -146,12 +380,22 @@ class Krb5:
         :return: True when credentials are successfully stored, 
             otherwise False.
         """
+        if not creds:
+            # Acquisition failed, there is nothing to store.
+            return False
         if not store:
             # default store self._store == {} doesn't need touching.
             store = None
+        start = time.perf_counter()
         try:
-            creds.store(store=store, usage=usage, set_default=set_default,
-                        overwrite=overwrite)
+            with tracing.span(
+                    "krb5.store_creds", principal=str(self.principal),
+                    ccache=(store or {}).get("ccache"), usage=usage):
+                creds.store(store=store, usage=usage,
+                            set_default=set_default, overwrite=overwrite)
+            metrics.observe(
+                "krb5ticket_store_seconds", time.perf_counter() - start)
+            self._remember(creds)
             return True
         except (
             gssapi.exceptions.GSSError,
@@ -159,6 +403,9 @@ class Krb5:
             gssapi.exceptions.OperationUnavailableError,
             gssapi.exceptions.DuplicateCredentialsElementError,
         ) as e:
+            metrics.observe(
+                "krb5ticket_store_seconds", time.perf_counter() - start)
+            _record_error("store", e)
             logging.exception(f"Krb store failed, store:{store}")
             return False
 
@@ -174,17 +421,34 @@ class Krb5:
             when the credential cache is expired, and False on 
             errors.
         """
+        ccache = None
+        if isinstance(raw_creds, dict):
+            ccache = (raw_creds.get("store") or {}).get("ccache")
+        start = time.perf_counter()
         try:
-            if isinstance(raw_creds, gssapi.raw.creds.Creds):
-                creds = gssapi.Credentials(raw_creds)
-            else:
-                creds = gssapi.Credentials(**raw_creds)
-            creds.inquire()
-            self.lifetime = creds.lifetime
+            with tracing.span(
+                    "krb5.acquire_creds", principal=str(self.principal),
+                    ccache=ccache):
+                if isinstance(raw_creds, gssapi.raw.creds.Creds):
+                    creds = gssapi.Credentials(raw_creds)
+                else:
+                    creds = gssapi.Credentials(**raw_creds)
+                info = creds.inquire()
+            metrics.observe(
+                "krb5ticket_acquire_seconds", time.perf_counter() - start)
+            # ``creds.lifetime`` inquires again; reuse the result above.
+            self.lifetime = info.lifetime
+            if isinstance(info.lifetime, int):
+                metrics.set_gauge(
+                    "krb5ticket_ticket_remaining_seconds", info.lifetime,
+                    {"principal": str(self.principal)})
             # self.is_expired = False
             return creds
-        except gssapi.exceptions.ExpiredCredentialsError:
-            self._lifetime = None
+        except gssapi.exceptions.ExpiredCredentialsError as e:
+            metrics.observe(
+                "krb5ticket_acquire_seconds", time.perf_counter() - start)
+            _record_error("acquire", e)
+            self.lifetime = None
             # self.is_expired = True
             return None
         except (
@@ -192,6 +456,9 @@ class Krb5:
             gssapi.exceptions.MissingCredentialsError,
             gssapi.exceptions.InvalidCredentialsError
         ) as e:
+            metrics.observe(
+                "krb5ticket_acquire_seconds", time.perf_counter() - start)
+            _record_error("acquire", e)
             logging.debug(f"KRB acquire failed: {e}")
             return False
 
@@ -224,12 +491,17 @@ class Krb5:
             'initiate' or 'accept'.
         :return: creds or False
         """
+        creds = self._cached_creds()
+        if creds is not None:
+            return creds
         krb5_creds = {
             "name": self.principal,
             "usage": usage,
             "store": self.store
         }
         creds = self._acquire_creds(krb5_creds)
+        if creds:
+            self._remember(creds)
         return creds
         
     def acquire_with_keytab(
@@ -237,10 +509,20 @@ class Krb5:
         keytab: str,
         usage: str = "initiate",
         set_default: bool = True,
-        overwrite: bool = True
+        overwrite: bool = True,
+        force: bool = False
     ) -> bool:
         """
         Acquire Kerberos ticket-granting ticket (TGT) with keytab.
+
+        Concurrent calls for the same principal, keytab and credential
+        cache within the process share a single acquisition and its
+        result.
+
+        By default a valid TGT already held by the credential cache is
+        kept. With ``force``, the TGT is always acquired with the keytab
+        and stored into the credential cache, as needed to renew it
+        before it expires.
         
         :param keytab: Kerberos keytab file.
         :param usage: usage to store the credentials with -- either 'both',
@@ -249,30 +531,74 @@ class Krb5:
             default for the given store.
         :param overwrite: whether or not to overwrite existing credentials
             stored with the same name.
+        :param force: whether or not to acquire a new TGT even when the
+            credential cache holds a valid one.
         :return: True on success, otherwise False.
         """
         self.keytab = keytab
+        key = (
+            str(self.principal),
+            str(pathlib.Path(keytab).resolve()),
+            self.ccache["ccache"] if self.ccache else None,
+            usage,
+            set_default,
+            overwrite,
+            force
+        )
+        return _acquisitions.do(
+            key, self._acquire_with_keytab, usage, set_default, overwrite,
+            force)
+
+    def _acquire_with_keytab(
+        self,
+        usage: str,
+        set_default: bool,
+        overwrite: bool,
+        force: bool = False
+    ) -> bool:
+        """
+        Acquire Kerberos ticket-granting ticket (TGT) with the keytab.
+
+        :param usage: usage to store the credentials with -- either 'both',
+            'initiate' or 'accept'.
+        :param set_default: whether or not to set these credentials as the
+            default for the given store.
+        :param overwrite: whether or not to overwrite existing credentials
+            stored with the same name.
+        :param force: whether or not to skip a valid TGT already held by
+            the credential cache.
+        :return: True on success, otherwise False.
+        """
         krb5_creds = {
             "name": self.principal,
             "usage": usage,
             "store": self.store
         }
-        creds = self._acquire_creds(krb5_creds)
-        if creds:
-            return True
+        if not force:
+            creds = self._acquire_creds(krb5_creds)
+            if creds:
+                self._remember(creds)
+                return True
 
-        temp_dir = tempfile.mkdtemp("-krb5")
-        temp_ccache = pathlib.Path(temp_dir).joinpath("ccache")
+        # Acquire through a new in-memory credential cache, then copy the
+        # credentials into the destination store.
+        memory_ccache = _memory_ccache()
+        krb5_creds["store"] = dict(krb5_creds["store"], ccache=memory_ccache)
         try:
-            krb5_creds.setdefault("store", {})["ccache"] = temp_ccache.as_posix()
-            return self._store_creds(
+            stored = self._store_creds(
                 self._acquire_creds(krb5_creds),
                 self.ccache,
                 usage,
                 set_default,
                 overwrite)
         finally:
-            shutil.rmtree(str(temp_dir), ignore_errors=True)
+            _destroy_ccache(memory_ccache)
+        # The acquired credentials refer to the destroyed cache; keep the
+        # ones of the destination store instead.
+        self.invalidate()
+        if stored:
+            self._acquire_default(usage)
+        return stored
 
     def acquire_with_password(
         self,
@@ -294,13 +620,17 @@ class Krb5:
         :return: True on success, otherwise False.
         """
         try:
-            krb5_creds = gssapi.raw.acquire_cred_with_password(
-                name=self.principal, 
-                password=password.encode("UTF-8"),
-                usage=usage,
-                mechs=[gssapi.raw.MechType.kerberos]
-            )
+            with tracing.span(
+                    "gssapi.acquire_cred_with_password",
+                    principal=str(self.principal), usage=usage):
+                krb5_creds = gssapi.raw.acquire_cred_with_password(
+                    name=self.principal, 
+                    password=password.encode("UTF-8"),
+                    usage=usage,
+                    mechs=[gssapi.raw.MechType.kerberos]
+                )
         except gssapi.exceptions.GSSError as e:
+            _record_error("acquire_with_password", e)
             logging.exception("Unable to acquire Kerberos credentials to obtain a ticket-granting ticket (TGT).")
             # Unable to acquire Kerberos credentials to obtain a
             # ticket-granting ticket (TGT).
@@ -312,3 +642,126 @@ class Krb5:
             usage,
             set_default,
             overwrite)
+
+    @property
+    def service_tickets(self) -> t.Dict[str, datetime.datetime]:
+        """
+        Gets the expiry date of every prefetched service ticket.
+        """
+        now, monotonic = datetime.datetime.now(), time.monotonic()
+        return {
+            spn: now + datetime.timedelta(seconds=expires_at - monotonic)
+            for spn, expires_at in self._service_tickets.items()
+        }
+
+    def _fetch_service_ticket(
+        self,
+        spn: str,
+        creds: gssapi.Credentials,
+        lifetime: t.Optional[int] = None
+    ) -> t.Optional[int]:
+        """
+        Obtains a service ticket by initiating a security context.
+
+        The ticket is cached in the credential cache by GSSAPI; the
+        context itself is discarded.
+
+        :param spn: service principal name, either "service/host@REALM"
+            or host-based "service@host".
+        :param creds: ``gssapi.Credentials`` object of the principal.
+        :param lifetime: minimum number of seconds the ticket must still
+            be valid for. A cached ticket expiring sooner isn't reused,
+            so a new one is requested from the KDC.
+        :return: service ticket lifetime in seconds, otherwise None on
+            errors.
+        """
+        name_type = gssapi.NameType.kerberos_principal if "/" in spn \
+            else gssapi.NameType.hostbased_service
+        try:
+            context = gssapi.SecurityContext(
+                name=gssapi.Name(spn, name_type),
+                creds=creds,
+                usage="initiate",
+                mech=gssapi.raw.MechType.kerberos,
+                lifetime=lifetime)
+            context.step()
+            return context.lifetime
+        except gssapi.exceptions.GSSError as e:
+            logging.debug(f"KRB service ticket for {spn} failed: {e}")
+            return None
+
+    def prefetch_service_tickets(
+        self,
+        spns: t.Iterable[str],
+        max_workers: int = 8,
+        lifetime: t.Optional[int] = None
+    ) -> t.Dict[str, t.Optional[datetime.datetime]]:
+        """
+        Obtains service tickets for many services in parallel.
+
+        Service tickets are cached in the credential cache, so the first
+        request to each service doesn't pay for a round-trip to the KDC.
+
+        :param spns: service principal names, either "service/host@REALM"
+            or host-based "service@host".
+        :param max_workers: maximum number of concurrent requests.
+        :param lifetime: minimum number of seconds each ticket must still
+            be valid for; cached tickets expiring sooner are replaced.
+        :return: dictionary of service principal names and the expiry
+            date of their ticket, None when it couldn't be obtained.
+        """
+        spns = list(dict.fromkeys(spns))
+        creds = self._acquire_default()
+        if not creds or not spns:
+            return {spn: None for spn in spns}
+
+        workers = min(max_workers, len(spns))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="krb5") as executor:
+            lifetimes = list(executor.map(
+                lambda spn: self._fetch_service_ticket(spn, creds, lifetime),
+                spns))
+
+        now, monotonic = datetime.datetime.now(), time.monotonic()
+        expiry = {}
+        for spn, lifetime in zip(spns, lifetimes):
+            if lifetime is None:
+                self._service_tickets.pop(spn, None)
+                expiry[spn] = None
+            else:
+                self._service_tickets[spn] = monotonic + lifetime
+                expiry[spn] = now + datetime.timedelta(seconds=lifetime)
+        return expiry
+
+    def refresh_service_tickets(
+        self,
+        margin: int = 300,
+        max_workers: int = 8
+    ) -> t.Dict[str, t.Optional[datetime.datetime]]:
+        """
+        Obtains new tickets for prefetched services ahead of their expiry.
+
+        GSSAPI reuses a cached service ticket until it expires, so the
+        tickets are requested with the remaining lifetime of the TGT; the
+        cached tickets no longer qualify, the KDC is asked again and the
+        new tickets last as long as the TGT allows.
+
+        :param margin: number of seconds before expiry at which a service
+            ticket is refreshed.
+        :param max_workers: maximum number of concurrent requests.
+        :return: dictionary of the refreshed service principal names and
+            the expiry date of their ticket, None when it couldn't be
+            obtained.
+        """
+        deadline = time.monotonic() + margin
+        spns = [
+            spn for spn, expires_at in list(self._service_tickets.items())
+            if expires_at <= deadline
+        ]
+        if not spns:
+            return {}
+        lifetime = margin + 1
+        if self._acquire_default() and self.remaining_lifetime is not None:
+            lifetime = max(int(self.remaining_lifetime), lifetime)
+        return self.prefetch_service_tickets(
+            spns, max_workers, lifetime=lifetime)
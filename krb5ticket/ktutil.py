@@ -1,11 +1,60 @@
 import typing as t
 import re
 import io
-import pandas
+import os
+import time
+import select
+import shutil
 import pathlib
+import contextlib
 import subprocess
 
-from krb5ticket.errors import KtutilCommandNotFound
+from krb5ticket import tracing
+from krb5ticket.errors import (
+    KtutilCommandNotFound,
+    KtutilSessionError,
+    KtutilTimeout
+)
+
+
+_PROMPT = re.compile(r"^(\s*ktutil:\s*)+")
+
+
+def parse_keylist(lines: t.Iterable[str]) -> t.Iterator[dict]:
+    """
+    Parses the output of the ``ktutil`` ``list`` command.
+
+    Lines are consumed lazily and records are yielded as soon as they are
+    parsed. The ``-t`` (timestamp), ``-e`` (encryption type) and ``-k``
+    (key) variants are supported; prompts, headers and any other lines
+    are skipped.
+
+    :param lines: lines of the ``list`` command output.
+    :return: iterator of dictionary objects with keys: slot, kvno,
+        principal, and timestamp, enctype and key when listed.
+    """
+    timestamps = False
+    for line in lines:
+        line = _PROMPT.sub("", line).strip()
+        if not line or line.startswith("-"):
+            continue
+        fields = line.split()
+        if fields[0].lower() == "slot":
+            timestamps = "timestamp" in (f.lower() for f in fields)
+            continue
+        if len(fields) < 3 or not (fields[0].isdigit() and fields[1].isdigit()):
+            continue
+
+        record = {"slot": int(fields[0]), "kvno": int(fields[1])}
+        rest = fields[2:]
+        if len(rest) > 1 and rest[-1].startswith("(0x"):
+            record["key"] = rest.pop()[1:-1]
+        if len(rest) > 1 and rest[-1].startswith("("):
+            record["enctype"] = rest.pop()[1:-1]
+        if timestamps and len(rest) > 1:
+            record["timestamp"] = " ".join(rest[:-1])
+        record["principal"] = rest[-1]
+        yield record
 
 
 class ktutil:
@@ -63,23 +112,20 @@ class ktutil:
         :param stdout: ``io.TextIOWrapper`` object of the STDOUT stream.
         :return: None
         """
-        self._keylist = []
-        raw_keys = []
-        for line in stdout.readlines():
-            if (not re.findall(".*ktutil:.*", line) and 
-                not line.startswith("-")):
-                raw_keys.append(line)
-
-        if len(raw_keys) != 0:
-            keystrings = io.StringIO("\n".join(raw_keys))
-            data = pandas.read_csv(
-                keystrings, sep="\s+").to_dict(orient="index")
-            if 0 in data:
-                for keylist in data.values():
-                    keydata = {}
-                    for k, v in keylist.items():
-                        keydata[k.lower()] = v
-                    self._keylist.append(keydata)
+        self._keylist = list(parse_keylist(stdout))
+
+    def keylist_frame(self) -> "pandas.DataFrame":
+        """
+        Gets the current keylist as a ``pandas.DataFrame``.
+
+        ``pandas`` is an optional dependency and is only imported when
+        this method is called.
+
+        :return: ``pandas.DataFrame`` object containing the current
+            keylist.
+        """
+        import pandas
+        return pandas.DataFrame.from_records(self.keylist or [])
 
     @staticmethod
     def resolve_command(command: str):
@@ -91,12 +137,10 @@ class ktutil:
         :raises: ``KtutilCommandNotFound`` if the command executable was not
             found within the path environment variable.
         """
-        try:
-            path = subprocess.check_output(
-                ["which", command], stderr=subprocess.DEVNULL).strip()
-            return path.decode("UTF-8")
-        except subprocess.CalledProcessError:
+        path = shutil.which(command)
+        if path is None:
             raise KtutilCommandNotFound("Cannot find 'ktutil' command.")
+        return path
 
     @staticmethod
     def resolve_keytab_file(keytab_file: str) -> str:
@@ -138,20 +182,42 @@ class ktutil:
         """
         Instantiates the ``ktutil`` command-line interface.
         """
-        self._cursor = subprocess.Popen(
-            ktutil.resolve_command("ktutil"), stdin=subprocess.PIPE, 
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-            universal_newlines=True, close_fds=True)
+        with tracing.span("ktutil.init"):
+            self._cursor = subprocess.Popen(
+                ktutil.resolve_command("ktutil"), stdin=subprocess.PIPE, 
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
+                universal_newlines=True, close_fds=True)
 
-    def list(self) -> "ktutil":
+    def _send(self, command: str, *lines: str) -> "ktutil":
+        """
+        Writes a command, and its additional input lines, to ``ktutil``.
+
+        :param command: ``ktutil`` command line.
+        :param lines: additional input lines, such as a password.
+        :return: ``ktutil`` object.
+        """
+        with tracing.span("ktutil.command", command=command.split()[0]):
+            for line in (command, *lines):
+                self._cursor.stdin.write(f"{line}\n")
+            self._cursor.stdin.flush()
+        return self
+
+    def list(
+        self,
+        timestamps: bool = False,
+        enctypes: bool = False
+    ) -> "ktutil":
         """
         Displays the current keylist.
         
+        :param timestamps: whether or not to list timestamps (``-t``).
+        :param enctypes: whether or not to list encryption types (``-e``).
         :return: ``ktutil`` object.
         """
-        self._cursor.stdin.write("list\n")
-        self._cursor.stdin.flush()
-        return self
+        options = "".join([
+            " -t" if timestamps else "",
+            " -e" if enctypes else ""])
+        return self._send(f"list{options}")
 
     def read_kt(self, keytab_file: str) -> "ktutil":
         """
@@ -162,9 +228,7 @@ class ktutil:
         :return: ``ktutil`` object.
         """
         keytab_file = ktutil.resolve_keytab_file(keytab_file)
-        self._cursor.stdin.write(f"read_kt {keytab_file}\n")
-        self._cursor.stdin.flush()
-        return self
+        return self._send(f"read_kt {keytab_file}")
 
     def write_kt(self, keytab_file: str) -> "ktutil":
         """
@@ -174,9 +238,7 @@ class ktutil:
         :return: ``ktutil`` object.
         """
         keytab_file = ktutil.resolve_keytab_file(keytab_file)
-        self._cursor.stdin.write(f"write_kt {keytab_file}\n")
-        self._cursor.stdin.flush()
-        return self
+        return self._send(f"write_kt {keytab_file}")
 
     def delete_entry(self, slot: int) -> "ktutil":
         """
@@ -185,9 +247,7 @@ class ktutil:
         :param slot: keylist slot number.
         :return: ``ktutil`` object.
         """
-        self._cursor.stdin.write(f"delete_entry {slot}\n")
-        self._cursor.stdin.flush()
-        return self
+        return self._send(f"delete_entry {slot}")
 
     def add_entry(
         self,
@@ -208,11 +268,9 @@ class ktutil:
         :return: ``ktutil`` object.
         """
         type = ktutil.validate_entry_type(type)
-        self._cursor.stdin.write(
-            f"addent -{type} -p {principal} -k {kvno} -e {enctype}\n")
-        self._cursor.stdin.write(f"{password_or_key}\n")
-        self._cursor.stdin.flush()
-        return self
+        return self._send(
+            f"addent -{type} -p {principal} -k {kvno} -e {enctype}",
+            password_or_key)
 
     def quit(self) -> None:
         """
@@ -220,13 +278,291 @@ class ktutil:
 
         :return: None
         """
-        self._cursor.stdin.write("quit\n")
-        self._cursor.stdin.flush()
-        self.keylist = self._cursor.stdout
-        self.returncode = self._cursor.poll()
-        self.error = self._cursor.stderr
+        with tracing.span("ktutil.quit"):
+            self._cursor.stdin.write("quit\n")
+            self._cursor.stdin.flush()
+            self.keylist = self._cursor.stdout
+            self.returncode = self._cursor.poll()
+            self.error = self._cursor.stderr
 
         # Close pipes
         self._cursor.stdin.close()
         self._cursor.stdout.close()
-        self._cursor.stderr.close()
\ No newline at end of file
+        self._cursor.stderr.close()
+
+
+class KtutilResult(t.NamedTuple):
+    """
+    Result of a single ``ktutil`` session command.
+    """
+    command: str
+    output: str
+    error: str
+
+
+class KtutilSession:
+    """
+    Long-lived ``ktutil`` session.
+
+    Unlike ``ktutil``, which collects output when the process quits, a
+    session keeps one ``ktutil`` process alive and frames each command
+    against the ``ktutil:`` prompt, so the result of every command is
+    returned as soon as it completes. The current keylist is kept between
+    commands; use ``clear_list`` before working on another keytab.
+
+    :param timeout: default number of seconds to wait for each command,
+        or None to wait indefinitely.
+    """
+    PROMPT = b"ktutil:  "
+
+    def __init__(self, timeout: t.Optional[float] = None) -> t.NoReturn:
+        self.timeout = timeout
+        self._cursor = None
+        self._deadline = None
+        self.start()
+
+    def __enter__(self) -> "KtutilSession":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __del__(self):
+        """
+        Close ``subprocess`` object.
+        """
+        if getattr(self, "_cursor", None):
+            self.terminate()
+
+    @property
+    def alive(self) -> bool:
+        """
+        Gets whether or not the ``ktutil`` process is running.
+        """
+        return self._cursor is not None and self._cursor.poll() is None
+
+    def start(self) -> None:
+        """
+        Starts the ``ktutil`` process and waits for its first prompt.
+        """
+        with tracing.span("ktutil.init"):
+            self._cursor = subprocess.Popen(
+                ktutil.resolve_command("ktutil"), stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0,
+                close_fds=True)
+            self._read_response(self.timeout)
+
+    def terminate(self) -> None:
+        """
+        Terminates the ``ktutil`` process.
+        """
+        cursor, self._cursor = self._cursor, None
+        if cursor is None:
+            return
+        if cursor.poll() is None:
+            cursor.kill()
+        cursor.wait(timeout=30)
+        for stream in (cursor.stdin, cursor.stdout, cursor.stderr):
+            stream.close()
+
+    def close(self) -> None:
+        """
+        Quits ``ktutil`` and closes the session.
+        """
+        if self.alive:
+            try:
+                with tracing.span("ktutil.quit"):
+                    self._cursor.stdin.write(b"quit\n")
+                    self._cursor.stdin.flush()
+                    self._cursor.wait(timeout=30)
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        self.terminate()
+
+    @contextlib.contextmanager
+    def deadline(self, timeout: t.Optional[float]) -> t.Iterator["KtutilSession"]:
+        """
+        Bounds the total time of all commands executed within the context.
+
+        :param timeout: number of seconds all commands must complete in,
+            or None for no bound.
+        :return: iterator over the ``KtutilSession`` object.
+        """
+        self._deadline = None if timeout is None \
+            else time.monotonic() + timeout
+        try:
+            yield self
+        finally:
+            self._deadline = None
+
+    def _read_response(self, timeout: t.Optional[float]) -> t.Tuple[str, str]:
+        """
+        Reads command output up to the next ``ktutil:`` prompt.
+
+        :param timeout: number of seconds to wait, or None to wait
+            indefinitely.
+        :return: tuple of the STDOUT and STDERR output of the command.
+        :raises: ``KtutilTimeout`` if no prompt is read in time, and
+            ``KtutilSessionError`` if the process exits.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        stdout = self._cursor.stdout.fileno()
+        output = bytearray()
+        while not output.endswith(self.PROMPT):
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select(
+                        [stdout], [], [], remaining)[0]:
+                    self.terminate()
+                    raise KtutilTimeout(
+                        f"'ktutil' did not respond within {timeout} seconds.")
+            data = os.read(stdout, 65536)
+            if not data:
+                self.terminate()
+                raise KtutilSessionError("'ktutil' exited unexpectedly.")
+            output += data
+
+        stderr = self._cursor.stderr.fileno()
+        error = bytearray()
+        while select.select([stderr], [], [], 0)[0]:
+            data = os.read(stderr, 65536)
+            if not data:
+                break
+            error += data
+        return (output[:-len(self.PROMPT)].decode("UTF-8", "replace"),
+                error.decode("UTF-8", "replace").strip())
+
+    def execute(
+        self,
+        command: str,
+        *lines: str,
+        timeout: t.Optional[float] = None
+    ) -> KtutilResult:
+        """
+        Executes a ``ktutil`` command and waits for it to complete.
+
+        :param command: ``ktutil`` command line.
+        :param lines: additional input lines for the command, such as a
+            password.
+        :param timeout: number of seconds to wait, defaults to the session
+            timeout.
+        :return: ``KtutilResult`` object of the command.
+        :raises: ``KtutilSessionError`` if the session is closed.
+        """
+        if not self.alive:
+            raise KtutilSessionError("'ktutil' session is closed.")
+        data = "".join(f"{line}\n" for line in (command, *lines))
+        with tracing.span("ktutil.command", command=command.split()[0]):
+            try:
+                self._cursor.stdin.write(data.encode("UTF-8"))
+                self._cursor.stdin.flush()
+            except OSError as e:
+                self.terminate()
+                raise KtutilSessionError(f"'ktutil' session is broken: {e}")
+            timeout = self.timeout if timeout is None else timeout
+            if self._deadline is not None:
+                remaining = self._deadline - time.monotonic()
+                timeout = remaining if timeout is None \
+                    else min(timeout, remaining)
+            output, error = self._read_response(timeout)
+        return KtutilResult(command, output, error)
+
+    def list(
+        self,
+        timestamps: bool = False,
+        enctypes: bool = False,
+        timeout: t.Optional[float] = None
+    ) -> t.List[dict]:
+        """
+        Lists the current keylist.
+
+        :param timestamps: whether or not to list timestamps (``-t``).
+        :param enctypes: whether or not to list encryption types (``-e``).
+        :param timeout: number of seconds to wait for the command.
+        :return: list of dictionary objects containing the keylist.
+        """
+        options = "".join([
+            " -t" if timestamps else "",
+            " -e" if enctypes else ""])
+        result = self.execute(f"list{options}", timeout=timeout)
+        return list(parse_keylist(result.output.splitlines()))
+
+    def clear_list(self, timeout: t.Optional[float] = None) -> KtutilResult:
+        """
+        Clears the current keylist.
+
+        :param timeout: number of seconds to wait for the command.
+        :return: ``KtutilResult`` object of the command.
+        """
+        return self.execute("clear_list", timeout=timeout)
+
+    def read_kt(
+        self,
+        keytab_file: str,
+        timeout: t.Optional[float] = None
+    ) -> KtutilResult:
+        """
+        Reads the Kerberos V5 keytab file keytab into the current
+        keylist.
+
+        :param keytab_file: Kerberos V5 keytab file.
+        :param timeout: number of seconds to wait for the command.
+        :return: ``KtutilResult`` object of the command.
+        """
+        keytab_file = ktutil.resolve_keytab_file(keytab_file)
+        return self.execute(f"read_kt {keytab_file}", timeout=timeout)
+
+    def write_kt(
+        self,
+        keytab_file: str,
+        timeout: t.Optional[float] = None
+    ) -> KtutilResult:
+        """
+        Writes the current keylist to a keytab file.
+
+        :param keytab_file: Kerberos V5 keytab file.
+        :param timeout: number of seconds to wait for the command.
+        :return: ``KtutilResult`` object of the command.
+        """
+        keytab_file = ktutil.resolve_keytab_file(keytab_file)
+        return self.execute(f"write_kt {keytab_file}", timeout=timeout)
+
+    def delete_entry(
+        self,
+        slot: int,
+        timeout: t.Optional[float] = None
+    ) -> KtutilResult:
+        """
+        Deletes the entry in slot number from the current keylist.
+
+        :param slot: keylist slot number.
+        :param timeout: number of seconds to wait for the command.
+        :return: ``KtutilResult`` object of the command.
+        """
+        return self.execute(f"delete_entry {slot}", timeout=timeout)
+
+    def add_entry(
+        self,
+        principal: str,
+        password_or_key: str,
+        kvno: int,
+        enctype: str,
+        type: t.Optional[str] = "password",
+        timeout: t.Optional[float] = None
+    ) -> KtutilResult:
+        """
+        Adds principal to keylist using key or password.
+
+        :param principal: Kerberos principal.
+        :param password_or_key: password, or key when type is "key".
+        :param kvno: key version number.
+        :param enctype: encryption type.
+        :param type: keylist entry type -- either "password" or "key".
+        :param timeout: number of seconds to wait for the command.
+        :return: ``KtutilResult`` object of the command.
+        """
+        type = ktutil.validate_entry_type(type)
+        return self.execute(
+            f"addent -{type} -p {principal} -k {kvno} -e {enctype}",
+            password_or_key, timeout=timeout)
@@ -1,7 +1,101 @@
 import typing as t
-import shutil
+import time
+import logging
+import warnings
+import pathlib
+import itertools
+import contextlib
+import collections.abc
+import concurrent.futures
 
-from krb5ticket import ktutil
+from krb5ticket.ktutil import ktutil, KtutilSession
+from krb5ticket.errors import KeytabFormatError
+from krb5ticket.keytab import (
+    KEY_LENGTHS,
+    KEYTAB_CACHE,
+    delete_keytab_entries,
+    enctype_number,
+    iter_entries,
+    parse_principal,
+    write_keytab
+)
+from krb5ticket.string2key import SUPPORTED_ENCTYPES, derive_keys
+
+
+@contextlib.contextmanager
+def _ktutil_session(
+    session: t.Union[None, KtutilSession, t.Callable[[], KtutilSession]]
+) -> t.Iterator[KtutilSession]:
+    """
+    Provides a ``ktutil`` session with an empty keylist.
+
+    :param session: ``KtutilSession`` object to reuse, or a callable
+        returning one, otherwise a new session is started and closed on
+        exit.
+    :return: iterator over the ``KtutilSession`` object.
+    """
+    if session is not None and not isinstance(session, KtutilSession):
+        session = session()
+    if session is not None:
+        session.clear_list()
+        yield session
+        return
+    with KtutilSession() as session:
+        yield session
+
+
+def _native_entries(
+    principal: str,
+    password_or_passphrase: str,
+    enctypes: t.List[str],
+    kvno: int,
+    entry_type: str,
+    executor: t.Optional[concurrent.futures.Executor] = None
+) -> t.Optional[t.List[dict]]:
+    """
+    Builds keytab entries without the ``ktutil`` command-line interface.
+
+    :param principal: Kerberos principal.
+    :param password_or_passphrase: password or passphrase for key.
+    :param enctypes: list of encryption types to add.
+    :param kvno: key version number.
+    :param entry_type: keylist entry type -- either "password" or "key".
+    :param executor: ``concurrent.futures.Executor`` used to derive keys
+        from the password.
+    :return: list of dictionary objects containing the entries, otherwise
+        None when the entries cannot be built natively.
+    """
+    components, realm = parse_principal(principal)
+    numbers = [enctype_number(enctype) for enctype in enctypes]
+    if not realm or None in numbers:
+        return None
+
+    if entry_type == "password":
+        if not SUPPORTED_ENCTYPES.issuperset(numbers):
+            return None
+        keys = derive_keys(
+            [(principal, password_or_passphrase, n) for n in numbers],
+            executor)
+    else:
+        try:
+            keys = [bytes.fromhex(password_or_passphrase)] * len(numbers)
+        except ValueError:
+            return None
+        if any(KEY_LENGTHS[n] != len(k) for n, k in zip(numbers, keys)):
+            return None
+
+    timestamp = int(time.time())
+    return [
+        {
+            "components": components,
+            "realm": realm,
+            "timestamp": timestamp,
+            "kvno": kvno,
+            "enctype": number,
+            "key": key
+        }
+        for number, key in zip(numbers, keys)
+    ]
 
 
 def create_entries(
@@ -10,9 +104,16 @@ def create_entries(
     password_or_passphrase: str,
     enctypes: t.List[str],
     kvno: t.Optional[int] = 1,
-    entry_type: t.Optional[str] = "password"):
+    entry_type: t.Optional[str] = "password",
+    executor: t.Optional[concurrent.futures.Executor] = None,
+    session: t.Union[None, KtutilSession, t.Callable[[], KtutilSession]] = None):
     """
     Creates one or more entries and write keylist to a Kerberos keytab.
+
+    Entries are appended to the keytab file if it already exists. Keys 
+    of known encryption types, and keys derived from passwords for the 
+    AES and RC4-HMAC encryption types, are written natively; anything 
+    else is handed over to the ``ktutil`` command-line interface.
     
     :param principal: Kerberos principal.
     :param keytab_file: Kerberos V5 keytab file name. The file can be a 
@@ -21,16 +122,38 @@ def create_entries(
     :param enctypes: list of encryption types to add.
     :param kvno: key version number.
     :param entry_type: keylist entry type -- either "password" or "key".
+    :param executor: ``concurrent.futures.Executor`` used to derive keys
+        from the password, otherwise keys are derived in the calling
+        thread.
+    :param session: ``KtutilSession`` object to reuse for entries that
+        are handed over to ``ktutil``, or a callable returning one, only
+        called when needed, otherwise a new session is started.
+    :return: True on success, otherwise False.
     """
     keytab_file = ktutil.resolve_keytab_file(keytab_file)
-    kt = ktutil()
-    for enctype in enctypes:
-        kt.add_entry(
-            principal, password_or_passphrase, kvno, enctype, entry_type)
-    kt.write_kt(keytab_file)
-    kt.quit()
+    entry_type = ktutil.validate_entry_type(entry_type)
+
+    entries = _native_entries(
+        principal, password_or_passphrase, enctypes, kvno, entry_type,
+        executor)
+    if entries is not None:
+        try:
+            write_keytab(keytab_file, entries, append=True)
+        except (OSError, KeytabFormatError):
+            logging.exception(f"Unable to write Kerberos keytab '{keytab_file}'.")
+            return False
+        return True
+
+    with _ktutil_session(session) as kt:
+        errors = [
+            kt.add_entry(
+                principal, password_or_passphrase, kvno, enctype,
+                entry_type).error
+            for enctype in enctypes
+        ]
+        errors.append(kt.write_kt(keytab_file).error)
 
-    return True if kt.error else False
+    return not any(errors)
 
 
 def list_entries(keytab_file: str) -> t.Union[t.List[dict], bool]:
@@ -44,61 +167,153 @@ def list_entries(keytab_file: str) -> t.Union[t.List[dict], bool]:
     """
     keytab_file = ktutil.keytab_exists(keytab_file)
     if keytab_file:
-        kt = ktutil()
-        kt.read_kt(keytab_file)
-        kt.list()
-        kt.quit()
-        return kt.keylist
+        try:
+            entries = KEYTAB_CACHE.read(keytab_file)
+        except (KeytabFormatError, OSError):
+            return False
+        return [
+            {
+                "slot": entry["slot"],
+                "kvno": entry["kvno"],
+                "principal": entry["principal"]
+            }
+            for entry in entries
+        ]
     return False
 
 
-def delete_entries(keytab_file: str, slots: t.List[int]) -> bool:
+def delete_entries(
+    keytab_file: str,
+    slots: t.Union[t.Iterable[int], t.Callable[[dict], bool]],
+    session: t.Optional[KtutilSession] = None) -> bool:
     """
     Deletes one or more entries from a Kerberos keytab.
     
     This function will only delete slots that exist within the keylist. 
-    Once the slots are deleted, the current keylist will be written to 
-    a temporary file. This avoids having the keylist appended to the
-    keylist within the keytab file. Once the keylist is written to the 
-    temporary file, the temporary file will be move/renamed the original
-    keytab filename.
+    The keytab is rewritten natively in a single pass: the remaining
+    entries are written to a temporary file, which is then synced and
+    renamed to the original keytab filename. Slots refer to the keylist
+    before any deletion.
     
     :param keytab_file: Kerberos V5 keytab file name. The file can be a 
         relative path read from the user's home directory.
-    :param slots: list of slots to be deleted from the keylist.
+    :param slots: slots to be deleted from the keylist, as any iterable
+        of integers other than a string, or a function
+        called with each entry, as returned by
+        ``krb5ticket.keytab.parse_keytab``, returning whether or not to
+        delete it.
+    :param session: deprecated and ignored; entries are deleted without
+        ``ktutil``.
     :return: True on success, otherwise False.
     """
+    if session is not None:
+        warnings.warn(
+            "The 'session' argument of delete_entries is deprecated and "
+            "ignored.", DeprecationWarning, stacklevel=2)
+
     keytab_file = ktutil.keytab_exists(keytab_file)
-    if not keytab_file or not isinstance(slots, list):
+    if not keytab_file:
         return False
 
-    keytab_tmp = ktutil.resolve_keytab_file(f"{keytab_file}.tmp")
+    if callable(slots):
+        predicate = slots
+    elif isinstance(slots, collections.abc.Iterable) \
+            and not isinstance(slots, (str, bytes)):
+        slots = set(slots)
 
-    kt = ktutil()
+        def predicate(entry: dict) -> bool:
+            return entry["slot"] in slots
+    else:
+        return False
 
-    # Read the Kerberos keytab file first to check if slots exist before 
-    # trying to delete them.
-    kt.read_kt(keytab_file)
-    kt.list()
-    kt.quit()
-    existing_slots = [
-        key["slot"] for key in kt.keylist if key["slot"] in slots]
+    try:
+        deleted = delete_keytab_entries(keytab_file, predicate)
+    except (KeytabFormatError, OSError):
+        logging.exception(
+            f"Unable to delete entries from Kerberos keytab '{keytab_file}'.")
+        return False
 
-    if len(existing_slots) == 0:
-        return False # No slots exist to be deleted.
+    return deleted > 0 # No slots exist to be deleted otherwise.
 
-    # Re-initialize 'ktutil' command and delete the slot(s).
-    # Write the current keylist to a temporary file, then rename
-    # the temporary file to the original name. This avoids the
-    # duplication caused by the ``write_kt`` invocation.
 
-    kt.ktutil_init()
-    kt.read_kt(keytab_file)
-    for slot in existing_slots:
-        kt.delete_entry(slot)
-    kt.write_kt(keytab_tmp)
-    kt.quit()
+def compact_keytab(
+    keytab_file: str,
+    keep_kvnos: int = 2) -> t.Optional[int]:
+    """
+    Prunes old key versions from a Kerberos keytab.
 
-    shutil.move(keytab_tmp, keytab_file)
+    Only the ``keep_kvnos`` highest key version numbers of each principal
+    and encryption type are kept. The keytab is rewritten natively in a
+    single pass and replaced atomically, and left untouched when there is
+    nothing to prune.
+
+    :param keytab_file: Kerberos V5 keytab file name. The file can be a 
+        relative path read from the user's home directory.
+    :param keep_kvnos: number of key versions to keep per principal and
+        encryption type.
+    :return: number of deleted entries, 0 when there is nothing to prune,
+        otherwise None on errors.
+    """
+    keytab_file = ktutil.keytab_exists(keytab_file)
+    if not keytab_file or keep_kvnos < 1:
+        return None
+
+    try:
+        kvnos = {}
+        for entry in iter_entries(keytab_file):
+            kvnos.setdefault(
+                (entry["principal"], entry["enctype"]), set()).add(entry["kvno"])
+        stale = {
+            key: set(sorted(versions, reverse=True)[keep_kvnos:])
+            for key, versions in kvnos.items()
+            if len(versions) > keep_kvnos
+        }
+        if not stale:
+            return 0
+        return delete_keytab_entries(
+            keytab_file,
+            lambda entry: entry["kvno"] in stale.get(
+                (entry["principal"], entry["enctype"]), ()))
+    except (KeytabFormatError, OSError):
+        logging.exception(
+            f"Unable to compact Kerberos keytab '{keytab_file}'.")
+        return None
+
+
+def compact_keytabs(
+    directory: str,
+    keep_kvnos: int = 2,
+    pattern: str = "*.keytab",
+    recursive: bool = True,
+    max_workers: t.Optional[int] = None) -> t.Dict[str, t.Optional[int]]:
+    """
+    Prunes old key versions from every Kerberos keytab in a directory.
+
+    Keytabs are compacted with ``compact_keytab`` across a pool of
+    processes, so large directory trees use every CPU.
+
+    :param directory: directory containing the keytab files. The
+        directory can be a relative path read from the user's home
+        directory.
+    :param keep_kvnos: number of key versions to keep per principal and
+        encryption type.
+    :param pattern: glob pattern of the keytab file names.
+    :param recursive: whether or not to include keytabs within
+        subdirectories.
+    :param max_workers: maximum number of processes, defaults to the
+        number of CPUs.
+    :return: dictionary of the resolved keytab files and the result of
+        ``compact_keytab`` for each.
+    """
+    root = pathlib.Path(ktutil.resolve_keytab_file(directory))
+    files = root.rglob(pattern) if recursive else root.glob(pattern)
+    keytab_files = sorted(str(path) for path in files if path.is_file())
+    if not keytab_files:
+        return {}
 
-    return True if kt.error else False
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers) as executor:
+        results = executor.map(
+            compact_keytab, keytab_files, itertools.repeat(keep_kvnos),
+            chunksize=max(1, len(keytab_files) // 64))
+        return dict(zip(keytab_files, results))
@@ -0,0 +1,172 @@
+import typing as t
+import queue
+import threading
+import contextlib
+import concurrent.futures
+
+from krb5ticket.ktutil import KtutilSession
+from krb5ticket.ktutil_helpers import (
+    create_entries,
+    list_entries,
+    delete_entries
+)
+
+
+class KtutilPool:
+    """
+    Pool of warm ``ktutil`` sessions.
+
+    Keytab maintenance jobs are dispatched concurrently across ``size``
+    long-lived ``KtutilSession`` objects. Submitting blocks once
+    ``max_pending`` jobs are queued or running, so producers can't
+    outpace the pool. Sessions are only started once a job falls back
+    to ``ktutil``, and sessions that time out or exit are restarted
+    before their next job.
+
+    :param size: number of ``ktutil`` processes.
+    :param max_pending: maximum number of queued or running jobs,
+        defaults to four times the pool size.
+    :param timeout: default number of seconds the ``ktutil`` commands of
+        each job must complete in, or None to wait indefinitely. Keytabs
+        created, listed or deleted natively aren't bounded.
+    """
+    def __init__(
+        self,
+        size: int = 4,
+        max_pending: t.Optional[int] = None,
+        timeout: t.Optional[float] = None
+    ) -> t.NoReturn:
+        self.timeout = timeout
+        self._sessions = queue.SimpleQueue()
+        self._pending = threading.BoundedSemaphore(max_pending or size * 4)
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=size, thread_name_prefix="ktutil")
+        for _ in range(size):
+            # Placeholders; sessions are started on first use.
+            self._sessions.put(None)
+
+    def __enter__(self) -> "KtutilPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _run(
+        self,
+        func: t.Callable[..., t.Any],
+        timeout: t.Optional[float],
+        args: tuple,
+        kwargs: dict
+    ) -> t.Any:
+        """
+        Runs a job, handing it the next available session on demand.
+        """
+        held = []
+        try:
+            with contextlib.ExitStack() as stack:
+                def session() -> KtutilSession:
+                    if not held:
+                        held.append(self._sessions.get())
+                        if held[0] is None:
+                            held[0] = KtutilSession()
+                        elif not held[0].alive:
+                            held[0].start()
+                        stack.enter_context(held[0].deadline(timeout))
+                    return held[0]
+
+                return func(*args, session=session, **kwargs)
+        finally:
+            if held:
+                self._sessions.put(held[0])
+
+    def _dispatch(
+        self,
+        func: t.Callable[..., t.Any],
+        *args
+    ) -> concurrent.futures.Future:
+        """
+        Runs a callable on the pool's threads, applying backpressure.
+        """
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def submit(
+        self,
+        func: t.Callable[..., t.Any],
+        *args,
+        timeout: t.Optional[float] = None,
+        **kwargs
+    ) -> concurrent.futures.Future:
+        """
+        Submits a job to the pool.
+
+        Blocks while the maximum number of pending jobs is reached.
+
+        :param func: callable accepting a ``session`` keyword argument,
+            such as ``create_entries``. It is given a callable returning
+            the job's ``KtutilSession``, started on the first call.
+        :param timeout: number of seconds the ``ktutil`` commands of the
+            job must complete in, defaults to the pool timeout. Jobs
+            running over raise ``KtutilTimeout``.
+        :return: ``concurrent.futures.Future`` object of the job.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        return self._dispatch(self._run, func, timeout, args, kwargs)
+
+    def create_entries(self, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Submits a ``create_entries`` job to the pool.
+
+        :return: ``concurrent.futures.Future`` object of the job.
+        """
+        return self.submit(create_entries, *args, **kwargs)
+
+    def delete_entries(
+        self,
+        keytab_file: str,
+        slots: t.Union[t.Iterable[int], t.Callable[[dict], bool]]
+    ) -> concurrent.futures.Future:
+        """
+        Submits a ``delete_entries`` job to the pool.
+
+        Keytabs are rewritten natively, so these jobs only share the
+        pool's threads and backpressure, not its ``ktutil`` sessions.
+
+        :param keytab_file: Kerberos V5 keytab file name.
+        :param slots: slots to be deleted, or a predicate over entries.
+        :return: ``concurrent.futures.Future`` object of the job.
+        """
+        return self._dispatch(delete_entries, keytab_file, slots)
+
+    def list_entries(self, keytab_file: str) -> concurrent.futures.Future:
+        """
+        Submits a ``list_entries`` job to the pool.
+
+        Keytabs are listed natively, so these jobs only share the pool's
+        threads and backpressure, not its ``ktutil`` sessions.
+
+        :param keytab_file: Kerberos V5 keytab file name.
+        :return: ``concurrent.futures.Future`` object of the job.
+        """
+        return self._dispatch(list_entries, keytab_file)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shuts the pool down and closes its ``ktutil`` sessions.
+
+        :param wait: whether or not to wait for pending jobs to complete.
+        """
+        self._executor.shutdown(wait=wait)
+        while True:
+            try:
+                session = self._sessions.get_nowait()
+            except queue.Empty:
+                break
+            if session is not None:
+                session.close()
@@ -0,0 +1,225 @@
+import typing as t
+import re
+import datetime
+import pathlib
+import tempfile
+import threading
+import concurrent.futures
+
+from krb5ticket.krb5 import Krb5
+from krb5ticket.renewal import RenewalScheduler
+
+
+def _ccache_path(ccache: str) -> str:
+    """
+    Gets a credential cache name without the default ``FILE:`` type.
+    """
+    return ccache[5:] if ccache.startswith("FILE:") else ccache
+
+
+class Krb5Manager:
+    """
+    Kerberos ticket-granting tickets (TGTs) of many principals.
+
+    Principals are indexed by name, each with its own ``Krb5`` object,
+    keytab and credential cache. Tickets are acquired in bulk across a
+    worker pool, so starting up takes about as long as the slowest KDC
+    round-trip, and renewals are handled by one shared
+    ``RenewalScheduler``.
+
+    :param ccache_dir: directory in which a ``FILE:`` credential cache is
+        created for principals added without a credential cache, defaults
+        to a private temporary directory removed with the manager.
+    :param max_workers: maximum number of concurrent acquisitions.
+    :param scheduler: ``RenewalScheduler`` object renewing the tickets,
+        otherwise a scheduler with default settings is created.
+    """
+    def __init__(
+        self,
+        ccache_dir: t.Optional[str] = None,
+        max_workers: int = 16,
+        scheduler: t.Optional[RenewalScheduler] = None
+    ) -> t.NoReturn:
+        self.ccache_dir = ccache_dir
+        self.max_workers = max_workers
+        self.scheduler = scheduler or RenewalScheduler()
+        self._lock = threading.RLock()
+        self._krb5 = {}
+        self._keytabs = {}
+        self._ccaches = {}
+        self._temp_dir = None
+
+    def __contains__(self, principal: str) -> bool:
+        return principal in self._krb5
+
+    def __getitem__(self, principal: str) -> Krb5:
+        return self._krb5[principal]
+
+    def __iter__(self) -> t.Iterator[str]:
+        return iter(self.principals)
+
+    def __len__(self) -> int:
+        return len(self._krb5)
+
+    @property
+    def principals(self) -> t.List[str]:
+        """
+        Gets the names of the managed principals.
+        """
+        with self._lock:
+            return list(self._krb5)
+
+    def _ccache(self, principal: str) -> str:
+        """
+        Builds the credential cache of a principal within ``ccache_dir``.
+        """
+        ccache_dir = self.ccache_dir
+        if not ccache_dir:
+            with self._lock:
+                if self._temp_dir is None:
+                    self._temp_dir = tempfile.TemporaryDirectory(
+                        prefix="krb5ticket-")
+            ccache_dir = self._temp_dir.name
+        name = re.sub(r"[^\w.@-]", "_", principal)
+        path = pathlib.Path(ccache_dir).joinpath(f"krb5cc_{name}")
+        return f"FILE:{path}"
+
+    def add(
+        self,
+        principal: str,
+        keytab: t.Optional[str] = None,
+        ccache: t.Optional[str] = None,
+        **kwargs
+    ) -> Krb5:
+        """
+        Manages a principal.
+
+        :param principal: Kerberos principal.
+        :param keytab: Kerberos keytab file used to acquire and renew the
+            principal's tickets.
+        :param ccache: Kerberos credential cache, defaults to a credential
+            cache within ``ccache_dir``.
+        :param kwargs: additional keyword arguments for ``Krb5``.
+        :return: ``Krb5`` object of the principal.
+        :raises ValueError: when the credential cache is already used by
+            another managed principal.
+        """
+        ccache = ccache or self._ccache(principal)
+        path = _ccache_path(ccache)
+        with self._lock:
+            other = self._ccaches.get(path)
+            if other is not None and other != principal:
+                raise ValueError(
+                    f"Kerberos credential cache '{ccache}' is already used "
+                    f"by '{other}'.")
+            krb5 = Krb5(principal, ccache, **kwargs)
+            previous = self._krb5.get(principal)
+            if previous is not None:
+                self._ccaches.pop(_ccache_path(previous.ccache["ccache"]), None)
+            self._krb5[principal] = krb5
+            self._ccaches[path] = principal
+            if keytab:
+                self._keytabs[principal] = keytab
+            else:
+                self._keytabs.pop(principal, None)
+        return krb5
+
+    def remove(self, principal: str) -> None:
+        """
+        Stops managing a principal.
+
+        :param principal: Kerberos principal.
+        """
+        with self._lock:
+            krb5 = self._krb5.pop(principal, None)
+            self._keytabs.pop(principal, None)
+            if krb5 is not None:
+                self._ccaches.pop(_ccache_path(krb5.ccache["ccache"]), None)
+        if krb5 is not None:
+            self.scheduler.remove(str(krb5.principal))
+
+    def get(self, principal: str) -> t.Optional[Krb5]:
+        """
+        Gets the ``Krb5`` object of a principal.
+
+        :param principal: Kerberos principal.
+        :return: ``Krb5`` object, otherwise None if not managed.
+        """
+        return self._krb5.get(principal)
+
+    def acquire_all(
+        self,
+        principals: t.Optional[t.Iterable[str]] = None,
+        **options
+    ) -> t.Dict[str, bool]:
+        """
+        Acquires tickets with keytab for many principals concurrently.
+
+        :param principals: principals to acquire tickets for, defaults to
+            every managed principal with a keytab.
+        :param options: keyword arguments for ``Krb5.acquire_with_keytab``.
+        :return: dictionary of principals and whether or not their
+            acquisition succeeded.
+        """
+        with self._lock:
+            names = list(self._keytabs) if principals is None \
+                else [p for p in principals if p in self._keytabs]
+            jobs = {p: (self._krb5[p], self._keytabs[p]) for p in names}
+        if not jobs:
+            return {}
+
+        def acquire(principal: str) -> bool:
+            krb5, keytab = jobs[principal]
+            try:
+                return krb5.acquire_with_keytab(keytab, **options)
+            except Exception:
+                return False
+
+        workers = min(self.max_workers, len(jobs))
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="krb5") as executor:
+            return dict(zip(jobs, executor.map(acquire, jobs)))
+
+    def start_renewal(self, **options) -> None:
+        """
+        Renews the tickets of every managed principal with a keytab in the
+        background.
+
+        :param options: keyword arguments for ``Krb5.acquire_with_keytab``.
+        """
+        with self._lock:
+            jobs = [(self._krb5[p], k) for p, k in self._keytabs.items()]
+        for krb5, keytab in jobs:
+            self.scheduler.add(krb5, keytab, **options)
+        self.scheduler.start()
+
+    def stop_renewal(self) -> None:
+        """
+        Stops renewing tickets in the background.
+        """
+        self.scheduler.stop()
+
+    @property
+    def expiry(self) -> t.Dict[str, t.Optional[datetime.datetime]]:
+        """
+        Gets the credential expiry date of every managed principal.
+        """
+        with self._lock:
+            return {p: krb5.lifetime for p, krb5 in self._krb5.items()}
+
+    @property
+    def expired(self) -> t.List[str]:
+        """
+        Gets the managed principals whose credentials are expired.
+        """
+        with self._lock:
+            items = list(self._krb5.items())
+        return [p for p, krb5 in items if krb5.is_expired]
+
+    @property
+    def next_expiry(self) -> t.Optional[datetime.datetime]:
+        """
+        Gets the earliest credential expiry date across all principals.
+        """
+        dates = [d for d in self.expiry.values() if d is not None]
+        return min(dates) if dates else None
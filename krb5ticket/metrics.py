@@ -0,0 +1,255 @@
+import typing as t
+import math
+import logging
+import threading
+import http.server
+
+
+#: Metrics recorded by krb5ticket, with their type and description.
+METRICS = {
+    "krb5ticket_acquire_seconds": (
+        "histogram", "Time spent acquiring Kerberos credentials."),
+    "krb5ticket_store_seconds": (
+        "histogram", "Time spent storing Kerberos credentials."),
+    "krb5ticket_errors_total": (
+        "counter", "Kerberos operation failures by operation and error class."),
+    "krb5ticket_renewal_lag_seconds": (
+        "histogram", "Delay between a renewal being due and it starting."),
+    "krb5ticket_ticket_remaining_seconds": (
+        "gauge", "Remaining lifetime of the last acquired credentials."),
+}
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = t.Optional[t.Dict[str, str]]
+
+
+def _escape(value: t.Any) -> str:
+    """
+    Escapes a label value for the Prometheus text format.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"') \
+        .replace("\n", "\\n")
+
+
+class MetricsBackend:
+    """
+    Interface of a metrics backend.
+
+    Subclass it and override any of the methods, or provide the same
+    three methods, to forward the metrics recorded by krb5ticket to
+    another metrics library.
+    """
+    def increment(self, name: str, value: float = 1.0, labels: Labels = None):
+        """
+        Increments a counter.
+        """
+
+    def set(self, name: str, value: float, labels: Labels = None):
+        """
+        Sets a gauge.
+        """
+
+    def observe(self, name: str, value: float, labels: Labels = None):
+        """
+        Records a histogram observation.
+        """
+
+
+class MetricsRegistry(MetricsBackend):
+    """
+    In-process metrics backend with Prometheus text exposition.
+
+    :param buckets: upper bounds of the histogram buckets, in seconds.
+    """
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_BUCKETS) -> t.NoReturn:
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    @staticmethod
+    def _key(name: str, labels: Labels) -> tuple:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def increment(self, name: str, value: float = 1.0, labels: Labels = None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, labels: Labels = None):
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, labels: Labels = None):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [
+                    [0] * len(self.buckets), 0.0, 0]
+            counts = histogram[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    @staticmethod
+    def _format(name: str, labels: tuple, value: float) -> str:
+        if labels:
+            pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            name = f"{name}{{{pairs}}}"
+        if math.isinf(value):
+            return f"{name} {'+Inf' if value > 0 else '-Inf'}"
+        return f"{name} {value:g}" if value != int(value) \
+            else f"{name} {int(value)}"
+
+    def exposition(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+
+        :return: metrics as text.
+        """
+        with self._lock:
+            series = {}
+            for (name, labels), value in self._counters.items():
+                series.setdefault(name, []).append(
+                    self._format(name, labels, value))
+            for (name, labels), value in self._gauges.items():
+                series.setdefault(name, []).append(
+                    self._format(name, labels, value))
+            for (name, labels), (counts, total, count) in \
+                    self._histograms.items():
+                lines = series.setdefault(name, [])
+                for bound, bucket in zip(self.buckets, counts):
+                    lines.append(self._format(
+                        f"{name}_bucket", labels + (("le", f"{bound:g}"),),
+                        bucket))
+                lines.append(self._format(
+                    f"{name}_bucket", labels + (("le", "+Inf"),), count))
+                lines.append(self._format(f"{name}_sum", labels, total))
+                lines.append(self._format(f"{name}_count", labels, count))
+
+        output = []
+        for name in sorted(series):
+            kind, description = METRICS.get(name, ("untyped", name))
+            output.append(f"# HELP {name} {description}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(series[name])
+        return "\n".join(output) + "\n"
+
+
+#: Default in-process registry, used by ``enable`` and ``start_http_server``.
+REGISTRY = MetricsRegistry()
+
+_backends = []
+
+
+def add_backend(backend: MetricsBackend) -> None:
+    """
+    Starts forwarding metrics to a backend.
+
+    :param backend: ``MetricsBackend`` object.
+    """
+    if backend not in _backends:
+        _backends.append(backend)
+
+
+def remove_backend(backend: MetricsBackend) -> None:
+    """
+    Stops forwarding metrics to a backend.
+
+    :param backend: ``MetricsBackend`` object.
+    """
+    if backend in _backends:
+        _backends.remove(backend)
+
+
+def enable() -> MetricsRegistry:
+    """
+    Starts recording metrics in the default registry.
+
+    No backend is registered by default, so metrics cost nothing until
+    this function or ``add_backend`` is called.
+
+    :return: default ``MetricsRegistry`` object.
+    """
+    add_backend(REGISTRY)
+    return REGISTRY
+
+
+def _call(method: str, *args) -> None:
+    """
+    Calls a method on every backend; backend failures are logged, not
+    raised.
+    """
+    for backend in list(_backends):
+        try:
+            getattr(backend, method)(*args)
+        except Exception:
+            logging.exception(f"Metrics backend {backend!r} failed in {method}.")
+
+
+def increment(name: str, value: float = 1.0, labels: Labels = None) -> None:
+    """
+    Increments a counter in every backend.
+    """
+    if _backends:
+        _call("increment", name, value, labels)
+
+
+def set_gauge(name: str, value: float, labels: Labels = None) -> None:
+    """
+    Sets a gauge in every backend.
+    """
+    if _backends:
+        _call("set", name, value, labels)
+
+
+def observe(name: str, value: float, labels: Labels = None) -> None:
+    """
+    Records a histogram observation in every backend.
+    """
+    if _backends:
+        _call("observe", name, value, labels)
+
+
+def start_http_server(
+    port: int,
+    addr: str = "",
+    registry: t.Optional[MetricsRegistry] = None
+) -> http.server.ThreadingHTTPServer:
+    """
+    Serves the metrics in the Prometheus text format from a daemon thread.
+
+    The default registry is enabled when no registry is given.
+
+    :param port: port to listen on.
+    :param addr: address to listen on, defaults to all addresses.
+    :param registry: ``MetricsRegistry`` object to serve.
+    :return: ``http.server.ThreadingHTTPServer`` object; call its
+        ``shutdown`` method to stop serving.
+    """
+    registry = registry or enable()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = registry.exposition().encode("UTF-8")
+            self.send_response(200)
+            self.send_header(
+                "Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer((addr, port), Handler)
+    threading.Thread(
+        target=server.serve_forever, name="krb5-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,230 @@
+import typing as t
+import time
+import random
+import asyncio
+import logging
+import datetime
+import threading
+
+from krb5ticket import metrics
+from krb5ticket.krb5 import Krb5
+
+
+class _Renewal:
+    """
+    Renewal state of a managed principal.
+    """
+    __slots__ = ("krb5", "keytab", "options", "due", "failures", "error")
+
+    def __init__(self, krb5: Krb5, keytab: str, options: dict) -> None:
+        self.krb5 = krb5
+        self.keytab = keytab
+        self.options = options
+        self.due = time.monotonic()
+        self.failures = 0
+        self.error = None
+
+
+class RenewalScheduler:
+    """
+    Background renewal of Kerberos ticket-granting tickets (TGTs).
+
+    Each managed principal is renewed with its keytab once ``fraction``
+    of its ticket lifetime has elapsed. Renewal times are randomized by
+    ``jitter`` so that many processes started together don't renew at
+    the same time, and failed renewals are retried with exponential
+    backoff. The scheduler runs either in a daemon thread (``start``) or
+    as an asyncio task (``run``).
+
+    :param fraction: fraction of the ticket lifetime after which it is
+        renewed.
+    :param jitter: maximum relative deviation applied to every delay.
+    :param backoff: delay in seconds before the first retry of a failed
+        renewal, doubled after each consecutive failure.
+    :param max_backoff: maximum delay in seconds between retries.
+    """
+    def __init__(
+        self,
+        fraction: float = 0.75,
+        jitter: float = 0.1,
+        backoff: float = 5.0,
+        max_backoff: float = 300.0
+    ) -> t.NoReturn:
+        self.fraction = fraction
+        self.jitter = jitter
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._renewals = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._wakeup = None
+
+    def _jittered(self, delay: float) -> float:
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _notify(self) -> None:
+        """
+        Wakes the scheduler up so it picks up the new renewal times.
+        """
+        with self._condition:
+            self._condition.notify_all()
+        wakeup = self._wakeup
+        if wakeup is not None:
+            loop, event = wakeup
+            loop.call_soon_threadsafe(event.set)
+
+    def add(self, krb5: Krb5, keytab: str, **options) -> None:
+        """
+        Manages the renewal of a principal.
+
+        The first renewal is due immediately.
+
+        :param krb5: ``Krb5`` object of the principal.
+        :param keytab: Kerberos keytab file used to renew the ticket.
+        :param options: keyword arguments for ``Krb5.acquire_with_keytab``.
+        """
+        with self._condition:
+            self._renewals[str(krb5.principal)] = _Renewal(
+                krb5, keytab, options)
+        self._notify()
+
+    def remove(self, principal: str) -> None:
+        """
+        Stops managing the renewal of a principal.
+
+        :param principal: Kerberos principal.
+        """
+        with self._condition:
+            self._renewals.pop(str(principal), None)
+        self._notify()
+
+    @property
+    def next_renewals(self) -> t.Dict[str, datetime.datetime]:
+        """
+        Gets the next renewal time of every managed principal.
+        """
+        now, monotonic = datetime.datetime.now(), time.monotonic()
+        with self._condition:
+            return {
+                principal: now + datetime.timedelta(
+                    seconds=max(0.0, renewal.due - monotonic))
+                for principal, renewal in self._renewals.items()
+            }
+
+    def _renew(self, renewal: _Renewal) -> None:
+        """
+        Renews a ticket and schedules its next renewal.
+        """
+        metrics.observe(
+            "krb5ticket_renewal_lag_seconds",
+            max(0.0, time.monotonic() - renewal.due))
+        try:
+            renewed = renewal.krb5.acquire_with_keytab(
+                renewal.keytab, **dict(renewal.options, force=True))
+            error = None if renewed else "acquisition failed"
+        except Exception as e:
+            renewed, error = False, e
+
+        remaining = renewal.krb5.remaining_lifetime
+        if renewed and remaining is not None:
+            if renewal.krb5.service_tickets:
+                # Storing the new TGT replaced the cached service tickets.
+                renewal.krb5.prefetch_service_tickets(
+                    renewal.krb5.service_tickets)
+            renewal.failures = 0
+            renewal.error = None
+            delay = max(self.backoff, remaining * self.fraction)
+        else:
+            logging.warning(
+                f"Kerberos ticket renewal failed for "
+                f"{renewal.krb5.principal}: {error}")
+            renewal.failures += 1
+            renewal.error = error
+            delay = min(
+                self.max_backoff,
+                self.backoff * 2 ** (renewal.failures - 1))
+        renewal.due = time.monotonic() + self._jittered(delay)
+
+    def _due(self) -> t.Tuple[t.List[_Renewal], t.Optional[float]]:
+        """
+        Gets the renewals that are due, and the delay until the next one.
+        """
+        now = time.monotonic()
+        with self._condition:
+            renewals = list(self._renewals.values())
+        due = [renewal for renewal in renewals if renewal.due <= now]
+        pending = [renewal.due - now for renewal in renewals
+                   if renewal.due > now]
+        return due, min(pending) if pending else None
+
+    def renew_due(self) -> t.Optional[float]:
+        """
+        Renews every ticket that is due, in the calling thread.
+
+        :return: number of seconds until the next renewal is due,
+            otherwise None when no principal is managed.
+        """
+        due, _ = self._due()
+        for renewal in due:
+            self._renew(renewal)
+        return self._due()[1]
+
+    def _loop(self) -> None:
+        while not self._stopped:
+            self.renew_due()
+            # The delay is computed under the condition so a principal
+            # added in the meantime either is seen or notifies the wait.
+            with self._condition:
+                due, delay = self._due()
+                if not due and not self._stopped:
+                    self._condition.wait(delay)
+
+    def start(self) -> None:
+        """
+        Starts renewing tickets in a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._loop, name="krb5-renewal", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: t.Optional[float] = None) -> None:
+        """
+        Stops the renewal thread or task.
+
+        :param timeout: number of seconds to wait for the thread to exit.
+        """
+        self._stopped = True
+        self._notify()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    async def run(self) -> None:
+        """
+        Renews tickets until stopped, as an asyncio task.
+
+        Acquisitions run in the event loop's default executor so they
+        don't block the loop.
+        """
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        self._stopped = False
+        self._wakeup = (loop, event)
+        try:
+            while not self._stopped:
+                event.clear()
+                due, delay = self._due()
+                for renewal in due:
+                    await loop.run_in_executor(None, self._renew, renewal)
+                if due:
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._wakeup = None
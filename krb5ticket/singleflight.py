@@ -0,0 +1,66 @@
+import typing as t
+import threading
+
+
+class _Call:
+    """
+    In-flight call shared by all callers of the same key.
+    """
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Duplicate call suppression.
+
+    While a call for a key is in flight, callers with the same key wait
+    for it and receive its result (or exception) instead of starting a
+    call of their own. Once the call completes, the next caller starts a
+    new one.
+    """
+    def __init__(self) -> t.NoReturn:
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(
+        self,
+        key: t.Hashable,
+        func: t.Callable[..., t.Any],
+        *args,
+        **kwargs
+    ) -> t.Any:
+        """
+        Runs a callable unless a call with the same key is in flight.
+
+        :param key: key identifying duplicate calls.
+        :param func: callable to run.
+        :return: result of the call.
+        :raises: exception raised by the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,317 @@
+import typing as t
+import hmac
+import math
+import struct
+import hashlib
+import functools
+import concurrent.futures
+
+from krb5ticket.keytab import ENCTYPES, enctype_number, parse_principal
+
+
+#: Default PBKDF2 iteration counts for each supported encryption type.
+ITERATIONS = {
+    17: 4096,
+    18: 4096,
+    19: 32768,
+    20: 32768,
+}
+
+#: Encryption types whose keys can be derived in-process.
+SUPPORTED_ENCTYPES = frozenset([17, 18, 19, 20, 23])
+
+
+def _rotl8(value: int, shift: int) -> int:
+    return ((value << shift) | (value >> (8 - shift))) & 0xFF
+
+
+def _build_sbox() -> t.List[int]:
+    """
+    Builds the AES substitution box.
+
+    :return: list of the 256 substitution values.
+    """
+    sbox = [0] * 256
+    p = q = 1
+    while True:
+        # Multiply p by 3 and divide q by 3 in GF(2^8).
+        p = p ^ ((p << 1) & 0xFF) ^ (0x1B if p & 0x80 else 0)
+        q ^= q << 1
+        q ^= q << 2
+        q ^= q << 4
+        q &= 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        sbox[p] = (q ^ _rotl8(q, 1) ^ _rotl8(q, 2) ^ _rotl8(q, 3)
+                   ^ _rotl8(q, 4) ^ 0x63)
+        if p == 1:
+            break
+    sbox[0] = 0x63
+    return sbox
+
+
+_SBOX = _build_sbox()
+_XTIME = [((i << 1) ^ 0x1B) & 0xFF if i & 0x80 else i << 1 for i in range(256)]
+
+
+def _expand_key(key: bytes) -> t.List[t.List[int]]:
+    """
+    Expands an AES key into its round keys.
+
+    :param key: 16 or 32 byte AES key.
+    :return: list of 16 byte round keys.
+    """
+    nk = len(key) // 4
+    rounds = nk + 6
+    words = [list(key[i:i + 4]) for i in range(0, len(key), 4)]
+    rcon = 1
+    for i in range(nk, 4 * (rounds + 1)):
+        word = list(words[i - 1])
+        if i % nk == 0:
+            word = word[1:] + word[:1]
+            word = [_SBOX[b] for b in word]
+            word[0] ^= rcon
+            rcon = _XTIME[rcon]
+        elif nk > 6 and i % nk == 4:
+            word = [_SBOX[b] for b in word]
+        words.append([a ^ b for a, b in zip(words[i - nk], word)])
+    return [
+        sum(words[i:i + 4], []) for i in range(0, len(words), 4)
+    ]
+
+
+def _aes_encrypt(round_keys: t.List[t.List[int]], block: bytes) -> bytes:
+    """
+    Encrypts a single 16 byte block with AES.
+
+    Key derivation only encrypts a handful of blocks per key, so a plain
+    Python implementation is sufficient and avoids a dependency on a
+    cryptography library.
+
+    :param round_keys: round keys from ``_expand_key``.
+    :param block: 16 byte plaintext block.
+    :return: 16 byte ciphertext block.
+    """
+    state = [b ^ k for b, k in zip(block, round_keys[0])]
+    last = len(round_keys) - 1
+    for rnd in range(1, last + 1):
+        state = [_SBOX[b] for b in state]
+        # ShiftRows over the column-major state.
+        state = [state[(i + 4 * (i % 4)) % 16] for i in range(16)]
+        if rnd != last:
+            mixed = []
+            for c in range(0, 16, 4):
+                a0, a1, a2, a3 = state[c:c + 4]
+                total = a0 ^ a1 ^ a2 ^ a3
+                mixed += [
+                    a0 ^ total ^ _XTIME[a0 ^ a1],
+                    a1 ^ total ^ _XTIME[a1 ^ a2],
+                    a2 ^ total ^ _XTIME[a2 ^ a3],
+                    a3 ^ total ^ _XTIME[a3 ^ a0],
+                ]
+            state = mixed
+        state = [b ^ k for b, k in zip(state, round_keys[rnd])]
+    return bytes(state)
+
+
+def _nfold(data: bytes, size: int) -> bytes:
+    """
+    Stretches or folds data to the given size (RFC 3961 n-fold).
+
+    :param data: input octet string.
+    :param size: output size in bytes.
+    :return: n-folded octet string.
+    """
+    def rotate_right(value: bytes, bits: int) -> bytes:
+        shift, remain = divmod(bits, 8)
+        return bytes(
+            (value[i - shift] >> remain)
+            | ((value[i - shift - 1] << (8 - remain)) & 0xFF)
+            for i in range(len(value)))
+
+    def add_ones_complement(a: bytes, b: bytes) -> bytes:
+        values = [x + y for x, y in zip(a, b)]
+        while any(v & ~0xFF for v in values):
+            values = [
+                (values[i - len(values) + 1] >> 8) + (values[i] & 0xFF)
+                for i in range(len(values))]
+        return bytes(values)
+
+    length = len(data)
+    lcm = size * length // math.gcd(size, length)
+    buffer = b"".join(
+        rotate_right(data, 13 * i) for i in range(lcm // length))
+    return functools.reduce(
+        add_ones_complement,
+        (buffer[i:i + size] for i in range(0, lcm, size)))
+
+
+def _md4(data: bytes) -> bytes:
+    """
+    Computes the MD4 digest (RFC 1320).
+
+    ``hashlib`` only provides MD4 when the linked OpenSSL still enables
+    legacy digests, so a plain Python fallback is kept for RC4-HMAC.
+
+    :param data: input octet string.
+    :return: 16 byte digest.
+    """
+    try:
+        return hashlib.new("md4", data).digest()
+    except ValueError:
+        pass
+
+    mask = 0xFFFFFFFF
+
+    def rotl(x: int, n: int) -> int:
+        return ((x << n) | (x >> (32 - n))) & mask
+
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) \
+        + struct.pack("<Q", (len(data) * 8) & 0xFFFFFFFFFFFFFFFF)
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+    for offset in range(0, len(message), 64):
+        x = struct.unpack("<16I", message[offset:offset + 64])
+        a, b, c, d = h
+        for i in range(16):
+            k, s = i, (3, 7, 11, 19)[i % 4]
+            a = rotl((a + ((b & c) | (~b & d)) + x[k]) & mask, s)
+            a, b, c, d = d, a, b, c
+        for i in range(16):
+            k, s = (i % 4) * 4 + i // 4, (3, 5, 9, 13)[i % 4]
+            a = rotl(
+                (a + ((b & c) | (b & d) | (c & d)) + x[k] + 0x5A827999) & mask, s)
+            a, b, c, d = d, a, b, c
+        for i in range(16):
+            k = (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15)[i]
+            s = (3, 9, 11, 15)[i % 4]
+            a = rotl((a + (b ^ c ^ d) + x[k] + 0x6ED9EBA1) & mask, s)
+            a, b, c, d = d, a, b, c
+        h = [(v + n) & mask for v, n in zip(h, (a, b, c, d))]
+    return struct.pack("<4I", *h)
+
+
+def _aes_sha1_string_to_key(
+    password: bytes,
+    salt: bytes,
+    iterations: int,
+    length: int
+) -> bytes:
+    """
+    Derives an AES-CTS-HMAC-SHA1 key (RFC 3962).
+    """
+    tkey = hashlib.pbkdf2_hmac("sha1", password, salt, iterations, length)
+    round_keys = _expand_key(tkey)
+    block = _nfold(b"kerberos", 16)
+    key = b""
+    while len(key) < length:
+        block = _aes_encrypt(round_keys, block)
+        key += block
+    return key[:length]
+
+
+def _aes_sha2_string_to_key(
+    enctype: int,
+    password: bytes,
+    salt: bytes,
+    iterations: int,
+    length: int
+) -> bytes:
+    """
+    Derives an AES-CTS-HMAC-SHA2 key (RFC 8009).
+    """
+    digest = "sha256" if enctype == 19 else "sha384"
+    saltp = ENCTYPES[enctype].encode("ASCII") + b"\x00" + salt
+    tkey = hashlib.pbkdf2_hmac(digest, password, saltp, iterations, length)
+    label = struct.pack(">I", 1) + b"kerberos" + b"\x00" \
+        + struct.pack(">I", length * 8)
+    return hmac.new(tkey, label, digest).digest()[:length]
+
+
+def default_salt(principal: str) -> bytes:
+    """
+    Builds the default Kerberos salt of a principal.
+
+    The salt is the realm followed by all principal components.
+
+    :param principal: Kerberos principal, including the realm.
+    :return: salt octet string.
+    """
+    components, realm = parse_principal(principal)
+    if not realm:
+        raise ValueError(f"Kerberos principal '{principal}' has no realm.")
+    return (realm + "".join(components)).encode("UTF-8")
+
+
+def string_to_key(
+    enctype: t.Union[str, int],
+    password: t.Union[str, bytes],
+    salt: t.Union[str, bytes],
+    iterations: t.Optional[int] = None
+) -> bytes:
+    """
+    Derives a Kerberos key from a password.
+
+    Supports the AES-CTS-HMAC-SHA1 (RFC 3962), AES-CTS-HMAC-SHA2
+    (RFC 8009) and RC4-HMAC encryption types.
+
+    :param enctype: encryption type name or number.
+    :param password: Kerberos credential password.
+    :param salt: salt, usually from ``default_salt``. Ignored for
+        RC4-HMAC.
+    :param iterations: PBKDF2 iteration count, defaults to the
+        encryption type's default.
+    :return: derived key.
+    :raises: ``ValueError`` if the encryption type is not supported.
+    """
+    number = enctype_number(enctype)
+    if number not in SUPPORTED_ENCTYPES:
+        raise ValueError(f"Unsupported Kerberos encryption type '{enctype}'.")
+
+    if isinstance(password, bytes):
+        password = password.decode("UTF-8")
+    if number == 23:
+        return _md4(password.encode("UTF-16-LE"))
+
+    if isinstance(salt, str):
+        salt = salt.encode("UTF-8")
+    password = password.encode("UTF-8")
+    iterations = iterations or ITERATIONS[number]
+    length = 16 if number in (17, 19) else 32
+    if number in (17, 18):
+        return _aes_sha1_string_to_key(password, salt, iterations, length)
+    return _aes_sha2_string_to_key(number, password, salt, iterations, length)
+
+
+def _derive(job: t.Tuple[str, str, t.Union[str, int]]) -> bytes:
+    """
+    Derives the key of a single (principal, password, enctype) job.
+    """
+    principal, password, enctype = job
+    return string_to_key(enctype, password, default_salt(principal))
+
+
+def derive_keys(
+    jobs: t.Iterable[t.Tuple[str, str, t.Union[str, int]]],
+    executor: t.Optional[concurrent.futures.Executor] = None
+) -> t.List[bytes]:
+    """
+    Derives the keys of many principals and encryption types at once.
+
+    Keys don't depend on the key version number, so identical jobs are
+    only derived once. PBKDF2 releases the GIL, so both thread and
+    process pools run derivations in parallel.
+
+    :param jobs: (principal, password, enctype) tuples.
+    :param executor: ``concurrent.futures.Executor`` used to run the
+        derivations, otherwise they run in the calling thread.
+    :return: list of derived keys, in the order of the jobs.
+    :raises: ``ValueError`` if an encryption type is not supported.
+    """
+    jobs = list(jobs)
+    unique = list(dict.fromkeys(jobs))
+    if executor is None:
+        keys = map(_derive, unique)
+    else:
+        keys = executor.map(_derive, unique)
+    derived = dict(zip(unique, keys))
+    return [derived[job] for job in jobs]
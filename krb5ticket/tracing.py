@@ -0,0 +1,148 @@
+import typing as t
+import time
+import logging
+import contextlib
+
+
+class Span:
+    """
+    Timed operation reported to trace hooks.
+
+    :param name: operation name, such as "krb5.acquire_creds".
+    :param attributes: operation attributes, such as the principal or
+        credential cache.
+    """
+    __slots__ = ("name", "attributes", "start", "end", "error", "context")
+
+    def __init__(self, name: str, attributes: dict) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        # Free for hooks to keep their own state, e.g. a backend span.
+        self.context = {}
+
+    @property
+    def duration(self) -> t.Optional[float]:
+        """
+        Gets the duration of the operation in seconds, once it ended.
+        """
+        return None if self.end is None else self.end - self.start
+
+
+class TraceHook:
+    """
+    Interface of a trace hook.
+
+    Subclass it and override any of the callbacks, then register it with
+    ``add_hook``.
+    """
+    def on_start(self, span: Span) -> None:
+        """
+        Called when an operation starts.
+        """
+
+    def on_exception(self, span: Span, error: BaseException) -> None:
+        """
+        Called when an operation raises, before ``on_end``.
+        """
+
+    def on_end(self, span: Span) -> None:
+        """
+        Called when an operation ends, whether it succeeded or not.
+        """
+
+
+class OpenTelemetryHook(TraceHook):
+    """
+    Trace hook reporting operations as OpenTelemetry spans.
+
+    ``opentelemetry-api`` is an optional dependency and is only imported
+    when this hook is created.
+
+    :param tracer: OpenTelemetry tracer, defaults to the tracer of the
+        global tracer provider.
+    """
+    def __init__(self, tracer=None) -> t.NoReturn:
+        from opentelemetry import trace
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("krb5ticket")
+
+    def on_start(self, span: Span) -> None:
+        span.context["otel"] = self.tracer.start_span(
+            span.name, attributes={
+                k: str(v) for k, v in span.attributes.items()
+                if v is not None})
+
+    def on_exception(self, span: Span, error: BaseException) -> None:
+        otel_span = span.context["otel"]
+        otel_span.record_exception(error)
+        otel_span.set_status(
+            self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+
+    def on_end(self, span: Span) -> None:
+        span.context["otel"].end()
+
+
+_hooks = []
+
+
+def add_hook(hook: TraceHook) -> None:
+    """
+    Starts reporting operations to a trace hook.
+
+    :param hook: ``TraceHook`` object.
+    """
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_hook(hook: TraceHook) -> None:
+    """
+    Stops reporting operations to a trace hook.
+
+    :param hook: ``TraceHook`` object.
+    """
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def _call(callback: str, *args) -> None:
+    """
+    Calls a callback on every hook; hook failures are logged, not raised.
+    """
+    for hook in list(_hooks):
+        try:
+            getattr(hook, callback)(*args)
+        except Exception:
+            logging.exception(f"Trace hook {hook!r} failed in {callback}.")
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes) -> t.Iterator[t.Optional[Span]]:
+    """
+    Reports the operation run within the context to the trace hooks.
+
+    Without hooks registered, no span is created.
+
+    :param name: operation name.
+    :param attributes: operation attributes.
+    :return: iterator over the ``Span`` object, or None without hooks.
+    """
+    if not _hooks:
+        yield None
+        return
+    current = Span(name, attributes)
+    _call("on_start", current)
+    try:
+        yield current
+    except BaseException as e:
+        current.end = time.perf_counter()
+        current.error = e
+        _call("on_exception", current, e)
+        raise
+    else:
+        current.end = time.perf_counter()
+    finally:
+        _call("on_end", current)
@@ -10,9 +10,13 @@ setup(
     version=version,
     packages=find_packages(exclude=["tests", "tests.*"]),
     install_requires=[
-        "gssapi",
-        "pandas"
+        "gssapi"
     ],
+    extras_require={
+        "pandas": ["pandas"],
+        "opentelemetry": ["opentelemetry-api"],
+        "tests": ["pytest", "pytest-benchmark"]
+    },
     author="Deric Degagne",
     author_email="deric.degagne@gmail.com",
     description="Simple Python wrapper to create Kerberos ticket-granting tickets (TGT)",
@@ -21,8 +25,8 @@ setup(
     classifiers=[
         "Intended Audience :: Developers",
         "Intended Audience :: System Administrators",
-        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
         "License :: OSI Approved :: MIT License"
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
 )
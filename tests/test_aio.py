@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("gssapi")
+
+from krb5ticket.aio import AsyncKrb5  # noqa: E402
+
+
+@pytest.fixture
+def krb5():
+    krb5 = AsyncKrb5("user@EXAMPLE.COM", ccache="FILE:/nonexistent/ccache")
+    calls = []
+    lock = threading.Lock()
+
+    def acquire_with_password(password, *args):
+        with lock:
+            calls.append((password, *args))
+        time.sleep(0.1)
+        return password == "right"
+
+    krb5.krb5.acquire_with_password = acquire_with_password
+    krb5.calls = calls
+    return krb5
+
+
+def test_identical_calls_are_coalesced(krb5):
+    async def main():
+        return await asyncio.gather(
+            *(krb5.acquire_with_password("right") for _ in range(8)))
+
+    assert asyncio.run(main()) == [True] * 8
+    assert len(krb5.calls) == 1
+
+
+def test_calls_with_different_arguments_are_not_coalesced(krb5):
+    async def main():
+        return await asyncio.gather(
+            krb5.acquire_with_password("right"),
+            krb5.acquire_with_password("wrong"),
+            krb5.acquire_with_password("right", usage="both"))
+
+    assert asyncio.run(main()) == [True, False, True]
+    assert sorted(call[:2] for call in krb5.calls) == [
+        ("right", "both"), ("right", "initiate"), ("wrong", "initiate")]
+
+
+def test_cancelled_caller_does_not_cancel_others(krb5):
+    async def main():
+        first = asyncio.ensure_future(krb5.acquire_with_password("right"))
+        second = asyncio.ensure_future(krb5.acquire_with_password("right"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) is True
+    assert len(krb5.calls) == 1
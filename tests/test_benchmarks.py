@@ -0,0 +1,282 @@
+"""
+Benchmarks of the hot paths, against a throwaway local MIT KDC.
+
+Requires ``pytest-benchmark``; the Kerberos benchmarks also require
+``gssapi`` and the MIT KDC binaries (``krb5kdc``, ``kdb5_util`` and
+``kadmin.local``), and are skipped otherwise. The KDC only listens on
+the loopback interface. Run with, e.g.::
+
+    pytest tests/test_benchmarks.py --benchmark-json=benchmarks.json
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import concurrent.futures
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from krb5ticket.keytab import KEYTAB_CACHE, write_keytab  # noqa: E402
+from krb5ticket.ktutil import ktutil  # noqa: E402
+from krb5ticket.ktutil_helpers import (  # noqa: E402
+    create_entries,
+    delete_entries,
+    list_entries
+)
+
+
+REALM = "KRBTEST.COM"
+PASSWORD = "benchmark-password"
+SIZES = [1, 100, 10000]
+THREADS = 64
+
+
+def _which(command):
+    return shutil.which(command) or shutil.which(
+        command, path="/usr/sbin:/usr/local/sbin:/sbin")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def kdc(tmp_path_factory):
+    """
+    Starts a KDC for the ``KRBTEST.COM`` realm in a temporary directory.
+    """
+    pytest.importorskip("gssapi")
+    commands = {c: _which(c) for c in ("krb5kdc", "kdb5_util", "kadmin.local")}
+    missing = [c for c, path in commands.items() if path is None]
+    if missing:
+        pytest.skip(f"MIT KDC binaries not found: {', '.join(missing)}")
+
+    root = tmp_path_factory.mktemp("kdc")
+    port = _free_port()
+    (root / "krb5.conf").write_text(
+        f"[libdefaults]\n"
+        f"  default_realm = {REALM}\n"
+        f"  dns_lookup_kdc = false\n"
+        f"  dns_lookup_realm = false\n"
+        f"[realms]\n"
+        f"  {REALM} = {{\n"
+        f"    kdc = 127.0.0.1:{port}\n"
+        f"  }}\n")
+    (root / "kdc.conf").write_text(
+        f"[kdcdefaults]\n"
+        f"  kdc_listen = 127.0.0.1:{port}\n"
+        f"  kdc_tcp_listen = 127.0.0.1:{port}\n"
+        f"[realms]\n"
+        f"  {REALM} = {{\n"
+        f"    database_name = {root}/principal\n"
+        f"    key_stash_file = {root}/stash\n"
+        f"    acl_file = {root}/kadm5.acl\n"
+        f"  }}\n"
+        f"[logging]\n"
+        f"  kdc = FILE:{root}/kdc.log\n")
+    saved = {k: os.environ.get(k)
+             for k in ("KRB5_CONFIG", "KRB5_KDC_PROFILE", "KRB5CCNAME")}
+    os.environ.update(
+        KRB5_CONFIG=str(root / "krb5.conf"),
+        KRB5_KDC_PROFILE=str(root / "kdc.conf"),
+        KRB5CCNAME=f"FILE:{root}/ccache")
+
+    def run(*args):
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+
+    run(commands["kdb5_util"], "create", "-s", "-r", REALM, "-P", "master")
+    keytab = root / "user.keytab"
+    run(commands["kadmin.local"], "-r", REALM, "-q",
+        f"addprinc -pw {PASSWORD} user@{REALM}")
+    run(commands["kadmin.local"], "-r", REALM, "-q",
+        f"ktadd -k {keytab} -norandkey user@{REALM}")
+    process = subprocess.Popen(
+        [commands["krb5kdc"], "-n", "-r", REALM],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.skip("Local KDC did not start.")
+            time.sleep(0.05)
+
+    yield {"root": root, "keytab": str(keytab),
+           "principal": f"user@{REALM}"}
+
+    process.terminate()
+    process.wait(timeout=10)
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@pytest.fixture
+def krb5(kdc, tmp_path):
+    from krb5ticket.krb5 import Krb5
+    return Krb5(kdc["principal"], ccache=f"FILE:{tmp_path}/ccache")
+
+
+def test_acquire_with_keytab_cold(benchmark, kdc, krb5):
+    assert benchmark(krb5.acquire_with_keytab, kdc["keytab"], force=True)
+
+
+def test_acquire_with_keytab_warm(benchmark, kdc, krb5):
+    assert krb5.acquire_with_keytab(kdc["keytab"])
+    assert benchmark(krb5.acquire_with_keytab, kdc["keytab"])
+
+
+def _issued_tgts(kdc):
+    # The KDC logs every issued ticket, "AS_REQ ... ISSUE: ...".
+    log = kdc["root"] / "kdc.log"
+    lines = log.read_text().splitlines() if log.exists() else []
+    return sum(1 for line in lines if "AS_REQ" in line and "ISSUE" in line)
+
+
+def test_acquire_with_keytab_stress(benchmark, kdc, tmp_path):
+    from krb5ticket.krb5 import Krb5
+    ccache = f"FILE:{tmp_path}/ccache"
+    requests = []
+
+    def stress():
+        clients = [
+            Krb5(kdc["principal"], ccache=ccache) for _ in range(THREADS)]
+        barrier = threading.Barrier(THREADS)
+
+        def acquire(krb5):
+            barrier.wait()
+            return krb5.acquire_with_keytab(kdc["keytab"], force=True)
+
+        before = _issued_tgts(kdc)
+        with concurrent.futures.ThreadPoolExecutor(THREADS) as executor:
+            results = list(executor.map(acquire, clients))
+        requests.append(_issued_tgts(kdc) - before)
+        return results
+
+    assert all(benchmark.pedantic(stress, rounds=3))
+    # Each round of concurrent acquisitions reaches the KDC once.
+    assert requests == [1, 1, 1]
+
+
+def _acquire_through_temp_dir(krb5, keytab):
+    # The intermediate step of acquire_with_keytab before MEMORY: caches.
+    import gssapi
+    temp_dir = tempfile.mkdtemp("-krb5")
+    try:
+        creds = gssapi.Credentials(
+            name=krb5.principal, usage="initiate",
+            store={"client_keytab": keytab,
+                   "ccache": f"FILE:{temp_dir}/ccache"})
+        creds.store(store=krb5.ccache, usage="initiate", overwrite=True)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return True
+
+
+@pytest.mark.parametrize("intermediate", ["temp_dir", "memory"])
+def test_intermediate_ccache(benchmark, kdc, krb5, intermediate):
+    if intermediate == "temp_dir":
+        acquire = _acquire_through_temp_dir
+    else:
+        def acquire(krb5, keytab):
+            return krb5.acquire_with_keytab(keytab, force=True)
+    assert benchmark(acquire, krb5, kdc["keytab"])
+
+
+def test_acquire_with_password(benchmark, krb5):
+    assert benchmark(krb5.acquire_with_password, PASSWORD)
+
+
+def test_is_expired(benchmark, kdc, krb5):
+    assert krb5.acquire_with_keytab(kdc["keytab"])
+    assert benchmark(lambda: krb5.is_expired) is False
+
+
+def _keytab(path, size):
+    write_keytab(str(path), (
+        {
+            "principal": f"service{i}/host.example.com@{REALM}",
+            "kvno": 1,
+            "enctype": 18,
+            "key": bytes(32),
+        }
+        for i in range(size)
+    ))
+    return str(path)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_create_entries(benchmark, tmp_path, size):
+    keytab = _keytab(tmp_path / "create.keytab", size)
+
+    def setup():
+        _keytab(keytab, size)
+
+    benchmark.pedantic(
+        create_entries,
+        args=(f"user@{REALM}", keytab, PASSWORD, ["aes256-cts"]),
+        setup=setup, rounds=5)
+
+
+@pytest.mark.parametrize("cached", [False, True], ids=["parse", "cached"])
+@pytest.mark.parametrize("size", SIZES)
+def test_list_entries(benchmark, tmp_path, size, cached):
+    keytab = _keytab(tmp_path / "list.keytab", size)
+    list_entries(keytab)
+
+    def setup():
+        if not cached:
+            KEYTAB_CACHE.invalidate(keytab)
+
+    result = benchmark.pedantic(
+        list_entries, args=(keytab,), setup=setup, rounds=20)
+    assert len(result) == size
+
+
+def _list_with_ktutil(keytab):
+    # list_entries before the native keytab reader.
+    kt = ktutil()
+    kt.read_kt(keytab)
+    kt.list()
+    kt.quit()
+    return kt.keylist
+
+
+@pytest.mark.parametrize("reader", ["native", "ktutil"])
+@pytest.mark.parametrize("size", SIZES)
+def test_list_entries_reader(benchmark, tmp_path, size, reader):
+    if reader == "ktutil" and shutil.which("ktutil") is None:
+        pytest.skip("ktutil command not found")
+    keytab = _keytab(tmp_path / "reader.keytab", size)
+    if reader == "native":
+        def setup():
+            KEYTAB_CACHE.invalidate(keytab)
+        func = list_entries
+    else:
+        setup, func = None, _list_with_ktutil
+    result = benchmark.pedantic(func, args=(keytab,), setup=setup, rounds=5)
+    assert len(result) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_delete_entries(benchmark, tmp_path, size):
+    keytab = str(tmp_path / "delete.keytab")
+
+    def setup():
+        _keytab(keytab, size)
+
+    benchmark.pedantic(
+        delete_entries, args=(keytab, {1}), setup=setup, rounds=5)
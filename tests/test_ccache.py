@@ -0,0 +1,89 @@
+import struct
+
+import pytest
+
+from krb5ticket.ccache import find_tgt, read_ccache
+from krb5ticket.errors import CcacheFormatError
+
+
+def build_ccache(version, credentials, kdc_offset=None):
+    order = ">" if version >= 3 else "="
+
+    def data(value):
+        return struct.pack(f"{order}I", len(value)) + value
+
+    def principal(components, realm):
+        if version == 1:
+            header = struct.pack(f"{order}I", len(components) + 1)
+        else:
+            header = struct.pack(f"{order}II", 1, len(components))
+        return header + data(realm) + b"".join(data(c) for c in components)
+
+    content = bytes((0x05, version))
+    if version == 4:
+        tags = b""
+        if kdc_offset is not None:
+            tags = struct.pack(">HHiI", 1, 8, kdc_offset, 0)
+        content += struct.pack(">H", len(tags)) + tags
+    client = principal([b"user"], b"EXAMPLE.COM")
+    content += client
+    for server, endtime, flags in credentials:
+        content += client + principal(*server)
+        content += struct.pack(f"{order}H", 18)
+        if version == 3:
+            content += struct.pack(f"{order}H", 18)
+        content += data(b"k" * 32)
+        content += struct.pack(
+            f"{order}IIIIBI", 1000, 0, endtime, endtime + 100, 0, flags)
+        content += struct.pack(f"{order}I", 0) * 2
+        content += data(b"ticket") + data(b"")
+    return content
+
+
+TGT = ([b"krbtgt", b"EXAMPLE.COM"], b"EXAMPLE.COM")
+SERVICE = ([b"HTTP", b"web.example.com"], b"EXAMPLE.COM")
+CONFIG = ([b"krb5_ccache_conf_data", b"pa_type"], b"X-CACHECONF:")
+
+
+@pytest.mark.parametrize("version", [1, 2, 3, 4])
+def test_read_ccache(tmp_path, version):
+    path = tmp_path / "ccache"
+    path.write_bytes(build_ccache(version, [
+        (CONFIG, 0, 0),
+        (TGT, 5000, 0x40e00000),
+        (SERVICE, 4000, 0x00200000),
+    ], kdc_offset=-5))
+    ccache = read_ccache(f"FILE:{path}")
+    assert ccache["version"] == 0x0500 | version
+    assert ccache["default_principal"] == "user@EXAMPLE.COM"
+    assert ccache["kdc_offset"] == (-5 if version == 4 else 0)
+    config, tgt, service = ccache["credentials"]
+    assert config["is_config"]
+    assert tgt["server"] == "krbtgt/EXAMPLE.COM@EXAMPLE.COM"
+    assert tgt["starttime"] == tgt["authtime"] == 1000
+    assert tgt["endtime"] == 5000
+    assert tgt["renew_till"] == 5100
+    assert tgt["flags"] == ["forwardable", "renewable", "initial", "pre_authent"]
+    assert service["flags"] == ["pre_authent"]
+    assert find_tgt(ccache) == tgt
+    assert find_tgt(ccache, "other@EXAMPLE.COM") is None
+
+
+def test_find_tgt_latest(tmp_path):
+    path = tmp_path / "ccache"
+    path.write_bytes(build_ccache(4, [(TGT, 5000, 0), (TGT, 9000, 0)]))
+    assert find_tgt(read_ccache(str(path)))["endtime"] == 9000
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"\x05",
+    b"\x04\x04",
+    b"\x05\x05",
+    build_ccache(4, [(TGT, 5000, 0)])[:-3],
+])
+def test_invalid_ccache(tmp_path, content):
+    path = tmp_path / "ccache"
+    path.write_bytes(content)
+    with pytest.raises(CcacheFormatError):
+        read_ccache(str(path))
@@ -0,0 +1,34 @@
+"""
+Import time of the package; ``import krb5ticket`` must stay cheap.
+"""
+import json
+import os
+import subprocess
+import sys
+
+# Microseconds; the package itself imports in about a millisecond.
+IMPORT_BUDGET = 50000
+HEAVY_MODULES = ["gssapi", "pandas", "subprocess"]
+
+
+def test_import_is_lazy():
+    code = (
+        "import json, sys, krb5ticket; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} "
+        "if m in sys.modules]))"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=root, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == []
+
+    # "import time: self [us] | cumulative | imported package"
+    cumulative = [
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+        and line.split("|")[2].rstrip() == " krb5ticket"
+    ]
+    assert len(cumulative) == 1
+    assert cumulative[0] < IMPORT_BUDGET
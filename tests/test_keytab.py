@@ -0,0 +1,256 @@
+import os
+import struct
+
+import pytest
+
+from krb5ticket.errors import KeytabFormatError
+from krb5ticket.keylist import Keylist
+from krb5ticket.keytab import (
+    KeytabCache,
+    delete_keytab_entries,
+    iter_entries,
+    parse_principal,
+    read_keytab,
+    serialize_entry,
+    unparse_principal,
+    write_keytab
+)
+from krb5ticket.ktutil_helpers import (
+    compact_keytab,
+    compact_keytabs,
+    delete_entries,
+    list_entries
+)
+
+
+def entry(principal, kvno, enctype=18, key=None):
+    return {
+        "principal": principal,
+        "kvno": kvno,
+        "enctype": enctype,
+        "timestamp": 1700000000,
+        "key": key or bytes([kvno % 256]) * (16 if enctype == 17 else 32),
+    }
+
+
+@pytest.fixture
+def keytab(tmp_path):
+    path = str(tmp_path / "test.keytab")
+    write_keytab(path, [
+        entry("host/web.example.com@EXAMPLE.COM", 1),
+        entry("host/web.example.com@EXAMPLE.COM", 1, 17),
+        entry("host/web.example.com@EXAMPLE.COM", 2),
+        entry("host/web.example.com@EXAMPLE.COM", 3),
+        entry("user@EXAMPLE.COM", 7),
+    ])
+    return path
+
+
+def summary(path):
+    return [(e["principal"], e["kvno"], e["enctype"]) for e in read_keytab(path)]
+
+
+def test_principal_round_trip():
+    principal = "svc/with\\/slash\\@at@EXAMPLE.COM"
+    components, realm = parse_principal(principal)
+    assert components == ["svc", "with/slash@at"]
+    assert realm == "EXAMPLE.COM"
+    assert unparse_principal(components, realm) == principal
+    assert parse_principal("user") == (["user"], None)
+
+
+def test_write_read_round_trip(keytab):
+    entries = read_keytab(keytab)
+    assert [e["slot"] for e in entries] == [1, 2, 3, 4, 5]
+    assert entries[0]["components"] == ["host", "web.example.com"]
+    assert entries[0]["realm"] == "EXAMPLE.COM"
+    assert entries[0]["timestamp"] == 1700000000
+    assert entries[1]["key"] == b"\x01" * 16
+    assert entries[4]["kvno"] == 7
+
+
+def test_write_keeps_mode_and_appends(keytab):
+    os.chmod(keytab, 0o640)
+    write_keytab(keytab, [entry("new@EXAMPLE.COM", 1)], append=True)
+    assert os.stat(keytab).st_mode & 0o7777 == 0o640
+    assert summary(keytab)[-1] == ("new@EXAMPLE.COM", 1, 18)
+    assert len(read_keytab(keytab)) == 6
+
+
+def test_write_follows_symlinks(tmp_path, keytab):
+    link = tmp_path / "link.keytab"
+    link.symlink_to(keytab)
+    write_keytab(str(link), [entry("new@EXAMPLE.COM", 1)], append=True)
+    assert link.is_symlink()
+    assert len(read_keytab(keytab)) == 6
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "geteuid") or os.geteuid() != 0, reason="requires root")
+def test_write_keeps_owner(keytab):
+    os.chown(keytab, 1234, 5678)
+    assert delete_keytab_entries(keytab, lambda e: e["slot"] == 1) == 1
+    st = os.stat(keytab)
+    assert (st.st_uid, st.st_gid) == (1234, 5678)
+
+
+def test_large_kvno_round_trip(tmp_path):
+    path = str(tmp_path / "kvno.keytab")
+    write_keytab(path, [entry("user@EXAMPLE.COM", 300)])
+    assert read_keytab(path)[0]["kvno"] == 300
+
+
+def test_version_1_keytab(tmp_path):
+    # Version 1 uses the native byte order and counts the realm as a
+    # component.
+    def data(value):
+        return struct.pack("=H", len(value)) + value
+
+    record = struct.pack("=H", 2) + data(b"EXAMPLE.COM") + data(b"user") \
+        + struct.pack("=IBH", 1700000000, 4, 17) + data(b"k" * 16)
+    path = tmp_path / "v1.keytab"
+    path.write_bytes(b"\x05\x01" + struct.pack("=i", len(record)) + record)
+    (parsed,) = read_keytab(str(path))
+    assert parsed["principal"] == "user@EXAMPLE.COM"
+    assert parsed["kvno"] == 4
+    assert parsed["name_type"] == 1
+
+
+def test_holes_are_skipped(keytab):
+    hole = struct.pack(">i", -10) + b"\x00" * 10
+    with open(keytab, "rb") as fh:
+        data = fh.read()
+    record = serialize_entry(entry("user@EXAMPLE.COM", 9))
+    with open(keytab, "wb") as fh:
+        fh.write(data[:2] + hole + data[2:] + record)
+    assert [e["slot"] for e in read_keytab(keytab)] == [1, 2, 3, 4, 5, 6]
+
+
+@pytest.mark.parametrize("data", [b"", b"\x05", b"\x06\x02", b"\x05\x03"])
+def test_invalid_keytab(tmp_path, data):
+    path = tmp_path / "bad.keytab"
+    path.write_bytes(data)
+    with pytest.raises(KeytabFormatError):
+        read_keytab(str(path))
+    with pytest.raises(KeytabFormatError):
+        list(iter_entries(str(path)))
+
+
+def test_truncated_keytab(keytab):
+    with open(keytab, "rb") as fh:
+        data = fh.read()
+    with open(keytab, "wb") as fh:
+        fh.write(data[:-10])
+    with pytest.raises(KeytabFormatError):
+        read_keytab(keytab)
+
+
+def test_iter_entries_matches_read_keytab(keytab):
+    entries = list(iter_entries(keytab))
+    assert all(isinstance(e["key"], memoryview) for e in entries)
+    assert [dict(e, key=bytes(e["key"])) for e in entries] \
+        == read_keytab(keytab)
+
+
+def test_delete_keytab_entries_by_slot_does_not_shift(keytab):
+    before = summary(keytab)
+    assert delete_keytab_entries(keytab, lambda e: e["slot"] in {1, 3}) == 2
+    assert summary(keytab) == [before[1], before[3], before[4]]
+
+
+def test_delete_keytab_entries_leaves_unmatched_keytab(keytab):
+    stat = os.stat(keytab)
+    assert delete_keytab_entries(keytab, lambda e: False) == 0
+    assert os.stat(keytab).st_ino == stat.st_ino
+    assert not [n for n in os.listdir(os.path.dirname(keytab))
+                if n.endswith(".tmp")]
+
+
+def test_delete_entries(keytab):
+    before = summary(keytab)
+    assert delete_entries(keytab, [2, 4, 99])
+    assert summary(keytab) == [before[0], before[2], before[4]]
+    assert delete_entries(keytab, lambda e: e["kvno"] == 7)
+    assert not delete_entries(keytab, {99})
+    assert not delete_entries(keytab, "1")
+    assert not delete_entries(keytab, 5)
+    assert not delete_entries(keytab + ".missing", {1})
+
+
+@pytest.mark.parametrize("slots", [
+    range(2, 4),
+    (slot for slot in [2, 3]),
+    {2: None, 3: None}.keys(),
+])
+def test_delete_entries_accepts_iterables(keytab, slots):
+    before = summary(keytab)
+    assert delete_entries(keytab, slots)
+    assert summary(keytab) == [before[0], before[3], before[4]]
+
+
+def test_list_entries(keytab):
+    assert list_entries(keytab)[0] == {
+        "slot": 1, "kvno": 1, "principal": "host/web.example.com@EXAMPLE.COM"}
+    assert list_entries(keytab + ".missing") is False
+
+
+def test_compact_keytab(keytab):
+    assert compact_keytab(keytab, keep_kvnos=2) == 1
+    assert summary(keytab) == [
+        ("host/web.example.com@EXAMPLE.COM", 1, 17),
+        ("host/web.example.com@EXAMPLE.COM", 2, 18),
+        ("host/web.example.com@EXAMPLE.COM", 3, 18),
+        ("user@EXAMPLE.COM", 7, 18),
+    ]
+    assert compact_keytab(keytab, keep_kvnos=2) == 0
+    assert compact_keytab(keytab, keep_kvnos=0) is None
+    assert compact_keytab(keytab + ".missing") is None
+
+
+def test_compact_keytabs(tmp_path, keytab):
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    other = str(sub / "other.keytab")
+    write_keytab(other, read_keytab(keytab))
+    results = compact_keytabs(str(tmp_path), keep_kvnos=1, max_workers=2)
+    assert results == {keytab: 2, other: 2}
+    assert compact_keytabs(str(tmp_path), recursive=False) == {keytab: 0}
+
+
+def test_compact_keytabs_resolves_from_home(tmp_path, monkeypatch, keytab):
+    monkeypatch.setenv("HOME", str(tmp_path.parent))
+    monkeypatch.chdir("/")
+    assert compact_keytabs(tmp_path.name, keep_kvnos=1, max_workers=1) \
+        == {keytab: 2}
+
+
+def test_keytab_cache(keytab):
+    cache = KeytabCache(maxsize=1)
+    first = cache.read(keytab)
+    assert cache.read(keytab) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert set(first[0]) == set(KeytabCache.FIELDS)
+
+    write_keytab(keytab, [entry("user@EXAMPLE.COM", 1)])
+    assert len(cache.read(keytab)) == 1
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 1
+
+
+def test_keylist_indexes(keytab):
+    keylist = Keylist.from_file(keytab)
+    principal = "host/web.example.com@EXAMPLE.COM"
+    assert len(keylist) == 5
+    assert keylist.principals == [principal, "user@EXAMPLE.COM"]
+    assert keylist.latest_kvno(principal) == 3
+    assert keylist.latest_kvno("missing@EXAMPLE.COM") is None
+    assert [e.slot for e in keylist.entries_for(principal, kvno=1)] == [1, 2]
+    assert [e.slot for e in keylist.entries_for(
+        principal, enctypes=["aes128-cts"])] == [2]
+    assert keylist.slots_where(enctypes=[18], kvno=None) == {1, 3, 4, 5}
+    assert keylist.slots_where(
+        principal, predicate=lambda e: e.kvno > 1) == {3, 4}
+    assert keylist.entry_at(5).principal == "user@EXAMPLE.COM"
+    assert keylist[-1].key == bytes([7]) * 32
+    write_keytab(keytab, keylist.as_dicts())
+    assert Keylist.from_file(keytab)[0] == keylist[0]
@@ -0,0 +1,68 @@
+import pytest
+
+from krb5ticket.errors import KtutilCommandNotFound
+from krb5ticket.ktutil import parse_keylist
+from krb5ticket.ktutil_helpers import list_entries
+from krb5ticket.ktutil_pool import KtutilPool
+
+
+def test_parse_keylist():
+    output = [
+        "ktutil:  slot KVNO Principal\n",
+        "---- ---- ---------------------------------------------------------\n",
+        "   1    2 user@EXAMPLE.COM\n",
+        "   2    3 host/web.example.com@EXAMPLE.COM\n",
+        "ktutil:  \n",
+    ]
+    assert list(parse_keylist(output)) == [
+        {"slot": 1, "kvno": 2, "principal": "user@EXAMPLE.COM"},
+        {"slot": 2, "kvno": 3, "principal": "host/web.example.com@EXAMPLE.COM"},
+    ]
+
+
+def test_parse_keylist_timestamps():
+    output = [
+        "slot KVNO Timestamp         Principal",
+        "---- ---- ----------------- -----------------------------------",
+        "   1    2 01/02/24 10:11:12 user@EXAMPLE.COM",
+    ]
+    assert list(parse_keylist(output)) == [{
+        "slot": 1,
+        "kvno": 2,
+        "timestamp": "01/02/24 10:11:12",
+        "principal": "user@EXAMPLE.COM",
+    }]
+
+
+def test_parse_keylist_enctypes_and_keys():
+    output = [
+        "slot KVNO Timestamp         Principal",
+        "---- ---- ----------------- -----------------------------------",
+        "   1    2 01/02/24 10:11:12 user@EXAMPLE.COM "
+        "(aes256-cts-hmac-sha1-96) (0x00112233)",
+        "   2    2 01/02/24 10:11:12 user@EXAMPLE.COM (arcfour-hmac)",
+    ]
+    first, second = parse_keylist(output)
+    assert first["enctype"] == "aes256-cts-hmac-sha1-96"
+    assert first["key"] == "0x00112233"
+    assert first["timestamp"] == "01/02/24 10:11:12"
+    assert first["principal"] == "user@EXAMPLE.COM"
+    assert second["enctype"] == "arcfour-hmac"
+    assert "key" not in second
+
+
+def test_parse_keylist_skips_other_lines():
+    output = ["", "ktutil:  ", "read_kt: No such file", "1 x y"]
+    assert list(parse_keylist(output)) == []
+
+
+def test_pool_starts_sessions_only_for_ktutil(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    keytab = str(tmp_path / "pool.keytab")
+    with KtutilPool(size=1) as pool:
+        assert pool.create_entries(
+            "user@EXAMPLE.COM", keytab, "password",
+            ["aes256-cts-hmac-sha1-96"]).result()
+        with pytest.raises(KtutilCommandNotFound):
+            pool.submit(lambda session: session()).result()
+        assert pool.list_entries(keytab).result() == list_entries(keytab)
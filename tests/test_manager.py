@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+pytest.importorskip("gssapi")
+
+from krb5ticket.manager import Krb5Manager  # noqa: E402
+
+
+def test_principals_get_private_ccaches():
+    manager = Krb5Manager()
+    first = manager.add("first@EXAMPLE.COM").ccache["ccache"]
+    second = manager.add("second@EXAMPLE.COM").ccache["ccache"]
+    assert first != second
+    directory = os.path.dirname(first[5:])
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_shared_ccache_is_rejected(tmp_path):
+    manager = Krb5Manager(ccache_dir=str(tmp_path))
+    ccache = manager.add("first@EXAMPLE.COM").ccache["ccache"]
+    with pytest.raises(ValueError):
+        manager.add("second@EXAMPLE.COM", ccache=ccache[5:])
+    manager.add("first@EXAMPLE.COM", ccache=f"FILE:{tmp_path}/other")
+    assert manager.add("second@EXAMPLE.COM", ccache=ccache)
+    manager.remove("second@EXAMPLE.COM")
+    assert manager.add("third@EXAMPLE.COM", ccache=ccache)
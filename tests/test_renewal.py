@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+pytest.importorskip("gssapi")
+
+from krb5ticket.renewal import RenewalScheduler  # noqa: E402
+
+
+class FakeKrb5:
+    principal = "user@EXAMPLE.COM"
+    remaining_lifetime = 3600
+    service_tickets = {}
+
+    def __init__(self):
+        self.renewed = threading.Event()
+
+    def acquire_with_keytab(self, keytab, **options):
+        self.renewed.set()
+        return True
+
+
+def test_principal_added_while_renewing_is_renewed():
+    scheduler = RenewalScheduler()
+    krb5 = FakeKrb5()
+    renew_due = scheduler.renew_due
+
+    def add_during_renewal():
+        delay = renew_due()
+        if not scheduler.next_renewals:
+            # Notifies before the loop waits.
+            scheduler.add(krb5, "user.keytab")
+        return delay
+
+    scheduler.renew_due = add_during_renewal
+    scheduler.start()
+    try:
+        assert krb5.renewed.wait(5)
+    finally:
+        scheduler.stop(timeout=5)
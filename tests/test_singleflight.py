@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from krb5ticket.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(16)
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return "result"
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target=caller) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["result"] * 16
+    assert len(calls) == 1
+
+
+def test_different_keys_do_not_share():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+
+
+def test_calls_after_completion_run_again():
+    flight = SingleFlight()
+    calls = []
+    flight.do("key", calls.append, 1)
+    flight.do("key", calls.append, 2)
+    assert calls == [1, 2]
+
+
+def test_errors_are_shared_and_not_kept():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def follower():
+        started.wait()
+        try:
+            flight.do("key", lambda: "unused")
+        except ValueError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    thread.join()
+    assert len(errors) == 1
+    assert flight.do("key", lambda: "ok") == "ok"
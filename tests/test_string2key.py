@@ -0,0 +1,68 @@
+import concurrent.futures
+
+import pytest
+
+from krb5ticket.string2key import default_salt, derive_keys, string_to_key
+
+
+RAEBURN = "ATHENA.MIT.EDUraeburn"
+RFC8009_SALT = bytes.fromhex("10DF9DD783E5BC8ACEA1730E74355F61") \
+    + b"ATHENA.MIT.EDUraeburn"
+
+
+@pytest.mark.parametrize("enctype, salt, iterations, key", [
+    # RFC 3962, appendix B.
+    (17, RAEBURN, 1, "42263c6e89f4fc28b8df68ee09799f15"),
+    (18, RAEBURN, 1, "fe697b52bc0d3ce14432ba036a92e65b"
+                     "bb52280990a2fa27883998d72af30161"),
+    (17, RAEBURN, 2, "c651bf29e2300ac27fa469d693bdda13"),
+    (18, RAEBURN, 2, "a2e16d16b36069c135d5e9d2e25f8961"
+                     "02685618b95914b467c67622225824ff"),
+    (17, RAEBURN, 1200, "4c01cd46d632d01e6dbe230a01ed642a"),
+    (18, RAEBURN, 1200, "55a6ac740ad17b4846941051e1e8b0a7"
+                        "548d93b0ab30a8bc3ff16280382b8c2a"),
+    (17, bytes.fromhex("1234567878563412"), 5,
+     "e9b23d52273747dd5c35cb55be619d8e"),
+    (18, bytes.fromhex("1234567878563412"), 5,
+     "97a4e786be20d81a382d5ebc96d5909c"
+     "abcdadc87ca48f574504159f16c36e31"),
+    # RFC 8009, appendix A.
+    (19, RFC8009_SALT, 32768, "089bca48b105ea6ea77ca5d2f39dc5e7"),
+    (20, RFC8009_SALT, 32768, "45bd806dbf6a833a9cffc1c94589a222"
+                              "367a79bc21c413718906e9f578a78467"),
+])
+def test_string_to_key_vectors(enctype, salt, iterations, key):
+    assert string_to_key(enctype, "password", salt, iterations).hex() == key
+
+
+def test_string_to_key_rc4():
+    # RC4-HMAC keys are the NT hash of the password.
+    assert string_to_key("arcfour-hmac", "password", "").hex() \
+        == "8846f7eaee8fb117ad06bdd830b7586c"
+
+
+def test_string_to_key_unsupported():
+    with pytest.raises(ValueError):
+        string_to_key("des-cbc-crc", "password", RAEBURN)
+
+
+def test_default_salt():
+    assert default_salt("host/web.example.com@EXAMPLE.COM") \
+        == b"EXAMPLE.COMhostweb.example.com"
+    with pytest.raises(ValueError):
+        default_salt("user")
+
+
+def test_derive_keys_dedupes_and_keeps_order():
+    jobs = [
+        ("user@EXAMPLE.COM", "secret", "aes128-cts"),
+        ("user@EXAMPLE.COM", "secret", 23),
+        ("user@EXAMPLE.COM", "secret", "aes128-cts"),
+    ]
+    expected = [
+        string_to_key(enctype, password, default_salt(principal))
+        for principal, password, enctype in jobs
+    ]
+    assert derive_keys(jobs) == expected
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        assert derive_keys(jobs, executor) == expected